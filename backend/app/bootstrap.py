@@ -0,0 +1,84 @@
+"""One-time database bootstrap and background job control
+
+Single-process runs call these from app.main; serve.py calls them once in the
+parent process before starting workers, which then skip them.
+"""
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.config import settings
+from app.database import engine, Base, SessionLocal
+from app.models import Role
+from app.services.account_service import purge_scheduler
+from app.services.archive_service import archive_scheduler
+from app.sharding import shard_router
+from app.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def wait_for_db(max_attempts=60, delay=2):
+    attempts = 0
+    while attempts < max_attempts:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.commit()
+            logger.info("✓ Database connection successful")
+            time.sleep(2)
+            Base.metadata.create_all(bind=engine)
+            shard_router.create_schema()
+            logger.info("✓ Database tables created/verified")
+            return True
+        except OperationalError as e:
+            attempts += 1
+            logger.warning("Database not ready (%d/%d), waiting... Error: %.100s", attempts, max_attempts, e)
+            time.sleep(delay)
+        except Exception as e:
+            attempts += 1
+            logger.warning("Error checking database (%d/%d): %.100s", attempts, max_attempts, e)
+            time.sleep(delay)
+    
+    logger.error("Failed to connect to database after 60 attempts")
+    raise Exception("Database initialization failed")
+
+
+def seed_default_roles():
+    """Create default roles if they don't exist"""
+    db = SessionLocal()
+    
+    try:
+        user_role = db.query(Role).filter(Role.name == "user").first()
+        if not user_role:
+            user_role = Role(name="user", description="Regular user")
+            db.add(user_role)
+        
+        admin_role = db.query(Role).filter(Role.name == "admin").first()
+        if not admin_role:
+            admin_role = Role(name="admin", description="Administrator")
+            db.add(admin_role)
+        
+        db.commit()
+        logger.info("Default roles initialized")
+    except Exception as e:
+        logger.error("Error seeding roles: %s", e)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def bootstrap():
+    wait_for_db()
+    seed_default_roles()
+
+
+def start_background_jobs():
+    purge_scheduler.start()
+    
+    if settings.ARCHIVE_ENABLED:
+        archive_scheduler.start()
+
+
+def stop_background_jobs():
+    purge_scheduler.stop()
+    archive_scheduler.stop()
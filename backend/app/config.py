@@ -12,6 +12,112 @@ APP_VERSION = "1.0.0"
 APP_ENV = "development"
 DEBUG = True
 LOG_LEVEL = "INFO"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Per-logger sampling as "logger=rate,...", e.g. "app.services.task_service=0.1"
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, _, rate in (
+        entry.partition("=") for entry in os.getenv("LOG_SAMPLE_RATES", "").split(",") if entry.strip()
+    )
+}
+
+# Connection pool per worker process; serve.py derives these from DB_CONNECTION_BUDGET
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "60"))
+
+# The psycopg 3 driver prepares a statement server-side once a connection has
+# run it this many times (0 = immediately); empty disables, e.g. behind
+# PgBouncer in transaction mode
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
+DB_PREPARE_THRESHOLD = int(DB_PREPARE_THRESHOLD) if DB_PREPARE_THRESHOLD else None
+
+# Set by serve.py in workers: schema/role bootstrap and background jobs run once in the parent
+SKIP_DB_BOOTSTRAP = os.getenv("SKIP_DB_BOOTSTRAP", "False").lower() == "true"
+RUN_BACKGROUND_JOBS = os.getenv("RUN_BACKGROUND_JOBS", "True").lower() == "true"
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "4"))
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "10000"))
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "1000"))
+GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30"))
+
+# Adaptive concurrency limit per worker (AIMD on latency and DB pool saturation)
+CONCURRENCY_LIMIT_ENABLED = os.getenv("CONCURRENCY_LIMIT_ENABLED", "True").lower() == "true"
+CONCURRENCY_INITIAL_LIMIT = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "20"))
+CONCURRENCY_MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN_LIMIT", "4"))
+CONCURRENCY_MAX_LIMIT = int(os.getenv("CONCURRENCY_MAX_LIMIT", "200"))
+CONCURRENCY_LATENCY_TARGET_MS = float(os.getenv("CONCURRENCY_LATENCY_TARGET_MS", "1000"))
+CONCURRENCY_BACKOFF_RATIO = float(os.getenv("CONCURRENCY_BACKOFF_RATIO", "0.9"))
+# Share of the limit each priority may fill, as "priority=share,...". Above 1.0 a
+# priority may overshoot the adaptive limit, so health checks and auth keep
+# working while lower priorities are being shed
+CONCURRENCY_PRIORITY_SHARES = {
+    name.strip(): float(share)
+    for name, _, share in (
+        entry.partition("=") for entry in os.getenv(
+            "CONCURRENCY_PRIORITY_SHARES", "critical=2.0,normal=0.8,low=0.5"
+        ).split(",") if entry.strip()
+    )
+}
+# Route priorities as "[METHOD ]path=priority,..."; a trailing * matches a prefix
+# and unmatched routes are "normal"
+CONCURRENCY_PRIORITIES = {
+    rule.strip(): priority.strip()
+    for rule, _, priority in (
+        entry.partition("=") for entry in os.getenv(
+            "CONCURRENCY_PRIORITIES",
+            "/health=critical,/=critical,/api/v1/auth/*=critical,"
+            "GET /api/v1/tasks=low,/api/v1/tasks/archive=low,/api/v1/dashboard=low,/api/v1/admin/*=low,"
+            "/api/v1/admin/profile=critical"
+        ).split(",") if entry.strip()
+    )
+}
+# "[METHOD ]path" rules for routes that are slow by design; they hold a slot but
+# their latency does not feed the adaptive limit
+CONCURRENCY_UNTIMED_ROUTES = [
+    rule.strip() for rule in os.getenv(
+        "CONCURRENCY_UNTIMED_ROUTES", "POST /api/v1/admin/profile"
+    ).split(",") if rule.strip()
+]
+
+# Task activity log: events are buffered in-process and written in batches
+ACTIVITY_BUFFER_SIZE = int(os.getenv("ACTIVITY_BUFFER_SIZE", "10000"))
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", "200"))
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "1.0"))
+
+# Idempotency-Key responses kept per worker for replay
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "500"))
+GZIP_COMPRESSION_LEVEL = int(os.getenv("GZIP_COMPRESSION_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+ACCOUNT_PURGE_BATCH_SIZE = int(os.getenv("ACCOUNT_PURGE_BATCH_SIZE", "1000"))
+ACCOUNT_PURGE_BATCH_PAUSE = float(os.getenv("ACCOUNT_PURGE_BATCH_PAUSE", "0.05"))
+# Deletion requests are picked up by the background-jobs process on this poll
+ACCOUNT_PURGE_POLL_SECONDS = float(os.getenv("ACCOUNT_PURGE_POLL_SECONDS", "5"))
+# A failed purge is retried after POLL * 2^attempts seconds, capped here
+ACCOUNT_PURGE_RETRY_MAX_SECONDS = float(os.getenv("ACCOUNT_PURGE_RETRY_MAX_SECONDS", "3600"))
+
+# Task shards as "name=url,name=url"; empty keeps all tasks in DATABASE_URL
+TASK_SHARDS = {
+    name.strip(): url.strip()
+    for name, _, url in (
+        entry.partition("=") for entry in os.getenv("TASK_SHARDS", "").split(",") if entry.strip()
+    )
+}
+SHARD_VIRTUAL_NODES = int(os.getenv("SHARD_VIRTUAL_NODES", "64"))
+SHARD_MAP_REFRESH_SECONDS = float(os.getenv("SHARD_MAP_REFRESH_SECONDS", "30"))
+TASK_ID_BLOCK_SIZE = int(os.getenv("TASK_ID_BLOCK_SIZE", "1000"))
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "True").lower() == "true"
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_MAX_BATCHES_PER_RUN = int(os.getenv("ARCHIVE_MAX_BATCHES_PER_RUN", "100"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
 
 CORS_ORIGINS = [
     "http://localhost:3000",
@@ -34,4 +140,48 @@ settings.APP_VERSION = APP_VERSION
 settings.APP_ENV = APP_ENV
 settings.DEBUG = DEBUG
 settings.LOG_LEVEL = LOG_LEVEL
+settings.LOG_QUEUE_SIZE = LOG_QUEUE_SIZE
+settings.LOG_SAMPLE_RATES = LOG_SAMPLE_RATES
 settings.CORS_ORIGINS = CORS_ORIGINS
+settings.CONCURRENCY_LIMIT_ENABLED = CONCURRENCY_LIMIT_ENABLED
+settings.CONCURRENCY_INITIAL_LIMIT = CONCURRENCY_INITIAL_LIMIT
+settings.CONCURRENCY_MIN_LIMIT = CONCURRENCY_MIN_LIMIT
+settings.CONCURRENCY_MAX_LIMIT = CONCURRENCY_MAX_LIMIT
+settings.CONCURRENCY_LATENCY_TARGET_MS = CONCURRENCY_LATENCY_TARGET_MS
+settings.CONCURRENCY_BACKOFF_RATIO = CONCURRENCY_BACKOFF_RATIO
+settings.CONCURRENCY_PRIORITY_SHARES = CONCURRENCY_PRIORITY_SHARES
+settings.CONCURRENCY_PRIORITIES = CONCURRENCY_PRIORITIES
+settings.CONCURRENCY_UNTIMED_ROUTES = CONCURRENCY_UNTIMED_ROUTES
+settings.ACTIVITY_BUFFER_SIZE = ACTIVITY_BUFFER_SIZE
+settings.ACTIVITY_BATCH_SIZE = ACTIVITY_BATCH_SIZE
+settings.ACTIVITY_FLUSH_INTERVAL = ACTIVITY_FLUSH_INTERVAL
+settings.IDEMPOTENCY_TTL_SECONDS = IDEMPOTENCY_TTL_SECONDS
+settings.IDEMPOTENCY_MAX_KEYS = IDEMPOTENCY_MAX_KEYS
+settings.IDEMPOTENCY_WAIT_SECONDS = IDEMPOTENCY_WAIT_SECONDS
+settings.COMPRESSION_MINIMUM_SIZE = COMPRESSION_MINIMUM_SIZE
+settings.GZIP_COMPRESSION_LEVEL = GZIP_COMPRESSION_LEVEL
+settings.BROTLI_QUALITY = BROTLI_QUALITY
+settings.ACCOUNT_PURGE_BATCH_SIZE = ACCOUNT_PURGE_BATCH_SIZE
+settings.ACCOUNT_PURGE_BATCH_PAUSE = ACCOUNT_PURGE_BATCH_PAUSE
+settings.ACCOUNT_PURGE_POLL_SECONDS = ACCOUNT_PURGE_POLL_SECONDS
+settings.ACCOUNT_PURGE_RETRY_MAX_SECONDS = ACCOUNT_PURGE_RETRY_MAX_SECONDS
+settings.TASK_SHARDS = TASK_SHARDS
+settings.SHARD_VIRTUAL_NODES = SHARD_VIRTUAL_NODES
+settings.SHARD_MAP_REFRESH_SECONDS = SHARD_MAP_REFRESH_SECONDS
+settings.TASK_ID_BLOCK_SIZE = TASK_ID_BLOCK_SIZE
+settings.ARCHIVE_ENABLED = ARCHIVE_ENABLED
+settings.ARCHIVE_AFTER_DAYS = ARCHIVE_AFTER_DAYS
+settings.ARCHIVE_BATCH_SIZE = ARCHIVE_BATCH_SIZE
+settings.ARCHIVE_MAX_BATCHES_PER_RUN = ARCHIVE_MAX_BATCHES_PER_RUN
+settings.ARCHIVE_INTERVAL_SECONDS = ARCHIVE_INTERVAL_SECONDS
+settings.DB_POOL_SIZE = DB_POOL_SIZE
+settings.DB_MAX_OVERFLOW = DB_MAX_OVERFLOW
+settings.DB_POOL_TIMEOUT = DB_POOL_TIMEOUT
+settings.DB_CONNECTION_BUDGET = DB_CONNECTION_BUDGET
+settings.DB_PREPARE_THRESHOLD = DB_PREPARE_THRESHOLD
+settings.SKIP_DB_BOOTSTRAP = SKIP_DB_BOOTSTRAP
+settings.RUN_BACKGROUND_JOBS = RUN_BACKGROUND_JOBS
+settings.WEB_WORKERS = WEB_WORKERS
+settings.WORKER_MAX_REQUESTS = WORKER_MAX_REQUESTS
+settings.WORKER_MAX_REQUESTS_JITTER = WORKER_MAX_REQUESTS_JITTER
+settings.GRACEFUL_SHUTDOWN_SECONDS = GRACEFUL_SHUTDOWN_SECONDS
@@ -1,14 +1,31 @@
 """Database Configuration and Session Management"""
-from sqlalchemy import create_engine
+from typing import Iterable
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from app.config import settings
 
+
+def engine_options(url: str) -> dict:
+    """Shared create_engine arguments, including per-worker pool sizing"""
+    options = {"echo": settings.DEBUG, "pool_pre_ping": True}
+    # In-memory SQLite uses a singleton pool that takes no sizing arguments
+    if url != "sqlite://" and ":memory:" not in url:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    # psycopg 3 (SQLAlchemy's default for postgresql://) keeps prepared statements
+    # per connection; psycopg2 (postgresql+psycopg2://) has no server-side prepare
+    if make_url(url).get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD}
+    return options
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -20,3 +37,13 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def pool_usage(engines: Iterable[Engine] = None) -> tuple[int, int]:
+    """Checked-out connections and pool capacity summed over distinct engines"""
+    checked_out = capacity = 0
+    for pooled_engine in {id(e): e for e in engines or [engine]}.values():
+        if isinstance(pooled_engine.pool, QueuePool):
+            checked_out += pooled_engine.pool.checkedout()
+            capacity += settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return checked_out, capacity
@@ -2,42 +2,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from app.config import settings
-from app.database import engine, Base
 from app.routes import v1_router
-from app.models import User, Task, Role
 from app.utils import get_logger
 from app.middleware.auth_middleware import JWTAuthMiddleware
-import time
-from sqlalchemy import text
-from sqlalchemy.exc import OperationalError
+from app.middleware.negotiation_middleware import ContentNegotiationMiddleware
+from app.middleware.request_context_middleware import RequestContextMiddleware
+from app.middleware.concurrency_limit_middleware import ConcurrencyLimitMiddleware
+from app.middleware.idempotency_middleware import IdempotencyMiddleware
+from app.bootstrap import bootstrap, start_background_jobs, stop_background_jobs
+from app.services.activity_service import activity_log
 
 logger = get_logger(__name__)
 
-def wait_for_db(max_attempts=60, delay=2):
-    attempts = 0
-    while attempts < max_attempts:
-        try:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-                conn.commit()
-            logger.info("✓ Database connection successful")
-            time.sleep(2)
-            Base.metadata.create_all(bind=engine)
-            logger.info("✓ Database tables created/verified")
-            return True
-        except OperationalError as e:
-            attempts += 1
-            logger.warning(f"Database not ready ({attempts}/{max_attempts}), waiting... Error: {str(e)[:100]}")
-            time.sleep(delay)
-        except Exception as e:
-            attempts += 1
-            logger.warning(f"Error checking database ({attempts}/{max_attempts}): {str(e)[:100]}")
-            time.sleep(delay)
-    
-    logger.error("Failed to connect to database after 60 attempts")
-    raise Exception("Database initialization failed")
-
-wait_for_db()
+if not settings.SKIP_DB_BOOTSTRAP:
+    bootstrap()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -48,8 +26,17 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Innermost, so it sees the user id set by JWTAuthMiddleware
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(JWTAuthMiddleware)
 
+app.add_middleware(ContentNegotiationMiddleware)
+
+# Outside auth and negotiation, so shed requests cost no auth work
+app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Outside the limiter, so shed 503s still carry CORS headers and preflights are never shed
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -58,6 +45,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestContextMiddleware)
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -85,29 +74,11 @@ app.include_router(v1_router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize default values on startup"""
-    from app.database import SessionLocal
-    db = SessionLocal()
-    
-    try:
-        # Create default roles if they don't exist
-        user_role = db.query(Role).filter(Role.name == "user").first()
-        if not user_role:
-            user_role = Role(name="user", description="Regular user")
-            db.add(user_role)
-        
-        admin_role = db.query(Role).filter(Role.name == "admin").first()
-        if not admin_role:
-            admin_role = Role(name="admin", description="Administrator")
-            db.add(admin_role)
-        
-        db.commit()
-        logger.info("Default roles initialized")
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    """Start background jobs unless a parent process runs them"""
+    # Every worker buffers its own activity events
+    activity_log.start()
+    if settings.RUN_BACKGROUND_JOBS:
+        start_background_jobs()
 
 
 @app.get("/", tags=["Health"])
@@ -134,6 +105,9 @@ async def health_check():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    activity_log.stop()
+    if settings.RUN_BACKGROUND_JOBS:
+        stop_background_jobs()
     logger.info("Application shutting down")
 
 
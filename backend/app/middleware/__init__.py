@@ -1,4 +1,11 @@
 """Middleware Package"""
 from app.middleware.auth_middleware import JWTAuthMiddleware
+from app.middleware.negotiation_middleware import ContentNegotiationMiddleware
+from app.middleware.request_context_middleware import RequestContextMiddleware
+from app.middleware.concurrency_limit_middleware import ConcurrencyLimitMiddleware
+from app.middleware.idempotency_middleware import IdempotencyMiddleware
 
-__all__ = ["JWTAuthMiddleware"]
+__all__ = [
+    "JWTAuthMiddleware", "ContentNegotiationMiddleware", "RequestContextMiddleware",
+    "ConcurrencyLimitMiddleware", "IdempotencyMiddleware"
+]
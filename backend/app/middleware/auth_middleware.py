@@ -15,6 +15,7 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
             "/docs/",
             "/openapi.json",
             "/redoc",
+            "/health",
         ]
         
         if any(request.url.path.startswith(path) for path in public_paths):
@@ -23,7 +24,7 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("Authorization")
         
         if not auth_header or not auth_header.startswith("Bearer "):
-            logger.warning(f"Missing or invalid auth header for {request.url.path}")
+            logger.warning("Missing or invalid auth header for %s", request.url.path)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Missing or invalid authorization header",
@@ -34,7 +35,7 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
         token_data = decode_token(token)
         
         if not token_data:
-            logger.warning(f"Invalid token for {request.url.path}")
+            logger.warning("Invalid token for %s", request.url.path)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token",
@@ -0,0 +1,81 @@
+"""Adaptive Concurrency Limit Middleware"""
+import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import settings
+from app.database import pool_usage
+from app.sharding import shard_router
+from app.utils import get_logger
+from app.utils.concurrency import AIMDLimiter, PriorityRules
+
+logger = get_logger(__name__)
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Sheds load before it queues on the DB pool. Each worker keeps an AIMD
+    limit driven by request latency, measured up to the start of the response
+    so background tasks run after it do not count; a fully checked-out pool
+    counts as an overload signal too. CONCURRENCY_UNTIMED_ROUTES hold a slot
+    without feeding latency. A request is admitted only while in-flight requests
+    are below its priority's share of the limit, so lower priorities are
+    refused first and critical routes keep the headroom. Refused requests get
+    503 with Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiter = AIMDLimiter(
+            initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+            min_limit=settings.CONCURRENCY_MIN_LIMIT,
+            max_limit=settings.CONCURRENCY_MAX_LIMIT,
+            latency_target=settings.CONCURRENCY_LATENCY_TARGET_MS / 1000,
+            backoff_ratio=settings.CONCURRENCY_BACKOFF_RATIO,
+        )
+        self.rules = PriorityRules(settings.CONCURRENCY_PRIORITIES)
+        self.shares = settings.CONCURRENCY_PRIORITY_SHARES
+        self.untimed = PriorityRules(
+            {rule: "untimed" for rule in settings.CONCURRENCY_UNTIMED_ROUTES}, default="timed"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.CONCURRENCY_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.rules.priority_for(scope["method"], scope["path"])
+        share = self.shares.get(priority, 1.0)
+
+        checked_out, capacity = pool_usage(shard_router.engines.values())
+        if capacity and checked_out >= capacity:
+            self.limiter.decrease()
+
+        if not self.limiter.try_acquire(share):
+            logger.warning(
+                "Shedding %s %s (priority %s, limit %.1f, in flight %d)",
+                scope["method"], scope["path"], priority, self.limiter.limit, self.limiter.in_flight
+            )
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.limiter.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        timed = self.untimed.priority_for(scope["method"], scope["path"]) == "timed"
+        start = time.perf_counter()
+        latency = None
+
+        async def send_timed(message):
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - start
+            self.limiter.release(latency if timed else None)
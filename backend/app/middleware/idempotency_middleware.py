@@ -0,0 +1,152 @@
+"""Idempotency-Key Middleware for mutating task endpoints"""
+import asyncio
+import hashlib
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils import get_logger
+from app.utils.idempotency import IdempotencyStore, InMemoryIdempotencyStore, StoredResponse
+
+logger = get_logger(__name__)
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+IDEMPOTENT_PATH_PREFIX = "/api/v1/tasks"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """
+    Runs inside the JWT middleware, so keys are scoped to the authenticated
+    user. The first request with a key executes; a retry with the same key and
+    request is answered from the stored response without reaching the routes
+    (or the database), and one that arrives while the original is still
+    running waits for it. Reusing a key for a different request, including
+    one negotiating a different response format, is a 422.
+    5xx responses are not stored, so the client can retry them.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore = None):
+        self.app = app
+        self.store = store or InMemoryIdempotencyStore(
+            settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith(IDEMPOTENT_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        user_id = scope.get("state", {}).get("user_id")
+        if idempotency_key is None or user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = self._fingerprint(scope, headers, body)
+        key = f"{user_id}:{idempotency_key}"
+
+        while True:
+            record, created = await self.store.begin(key, fingerprint)
+            if record.fingerprint != fingerprint:
+                await self._error(scope, receive, send, 422, "Idempotency-Key was already used for a different request")
+                return
+            if created:
+                await self._execute(scope, receive, send, body, key)
+                return
+
+            if record.response is None:
+                try:
+                    await asyncio.wait_for(record.done.wait(), settings.IDEMPOTENCY_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    await self._error(scope, receive, send, 409, "A request with this Idempotency-Key is still in progress")
+                    return
+            if record.response is not None:
+                logger.info("Replaying %s %s for Idempotency-Key", scope["method"], scope["path"])
+                await self._replay(send, record.response)
+                return
+            # The original failed and released the key: run this one instead
+
+    async def _execute(self, scope: Scope, receive: Receive, send: Send, body: bytes, key: str):
+        response_start: Message = None
+        chunks = []
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message: Message):
+            nonlocal response_start
+            if message["type"] == "http.response.start":
+                # Copy before outer middleware (compression) edits the headers in place
+                response_start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await self.store.release(key)
+            raise
+
+        if response_start is None or response_start["status"] >= 500:
+            await self.store.release(key)
+            return
+
+        await self.store.complete(key, StoredResponse(
+            status=response_start["status"],
+            headers=response_start["headers"],
+            body=b"".join(chunks),
+        ))
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                return bytes(body)
+
+    @staticmethod
+    def _fingerprint(scope: Scope, headers: Headers, body: bytes) -> str:
+        digest = hashlib.sha256()
+        # Routes encode MessagePack themselves, so the stored body is already in
+        # the format ContentNegotiationMiddleware picked from Accept
+        media_type = scope.get("state", {}).get("response_media_type", "")
+        for part in (
+            scope["method"], scope["path"], scope.get("query_string", b"").decode(),
+            headers.get("if-match", ""), media_type
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def _replay(send: Send, response: StoredResponse):
+        await send({
+            "type": "http.response.start",
+            "status": response.status,
+            "headers": response.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": response.body, "more_body": False})
+
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str):
+        await JSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
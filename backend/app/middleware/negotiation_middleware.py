@@ -0,0 +1,149 @@
+"""Content Negotiation Middleware (MessagePack + gzip/brotli)"""
+import zlib
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.negotiation import (
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE,
+    negotiate_media_type, negotiate_encoding, json_to_msgpack
+)
+
+# Bodies at least this large are compressed off the event loop
+THREAD_COMPRESSION_SIZE = 128 * 1024
+
+EXCLUDED_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(
+                settings.GZIP_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._brotli.process(body)
+            return data + (self._brotli.flush() if more_body else self._brotli.finish())
+
+        data = self._zlib.compress(body)
+        return data + self._zlib.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+    async def acompress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= THREAD_COMPRESSION_SIZE:
+            return await anyio.to_thread.run_sync(self.compress, body, more_body)
+        return self.compress(body, more_body)
+
+
+class ContentNegotiationMiddleware:
+    """
+    Negotiates `application/msgpack` through Accept and gzip/brotli through
+    Accept-Encoding. Small single-chunk bodies are sent as-is; streamed bodies
+    are compressed chunk by chunk with a sync flush so clients see data early.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        media_type = negotiate_media_type(headers.get("accept"))
+        encoding = negotiate_encoding(headers.get("accept-encoding"))
+
+        if media_type == JSON_MEDIA_TYPE and encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        if media_type == MSGPACK_MEDIA_TYPE:
+            # NegotiatedRoute encodes response models itself; the rest is transcoded below
+            scope.setdefault("state", {})["response_media_type"] = media_type
+
+        responder = _NegotiatedResponder(send, media_type, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _NegotiatedResponder:
+    def __init__(self, send: Send, media_type: str, encoding, minimum_size: int):
+        self._send = send
+        self.media_type = media_type
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Message = None
+        self.buffered = False
+        self.buffer = bytearray()
+        self.compressor: _Compressor = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            # Sized responses are buffered whole (intermediate middleware may still
+            # split them into chunks); unsized ones are treated as streams.
+            self.buffered = "content-length" in MutableHeaders(scope=message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self._send(message)
+        elif self.compressor is not None:
+            body = await self.compressor.acompress(body, more_body)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+        elif self.buffered:
+            self.buffer.extend(body)
+            if not more_body:
+                await self._send_first_body(bytes(self.buffer), more_body=False)
+        else:
+            await self._send_first_body(body, more_body)
+
+    async def _send_first_body(self, body: bytes, more_body: bool):
+        headers = MutableHeaders(scope=self.start_message)
+        content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            headers.add_vary_header("Accept")
+            if content_type == JSON_MEDIA_TYPE and not more_body and body:
+                body = json_to_msgpack(body)
+                headers["content-type"] = MSGPACK_MEDIA_TYPE
+                headers["content-length"] = str(len(body))
+
+        compressible = (
+            self.encoding is not None
+            and "content-encoding" not in headers
+            and not content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            and (more_body or len(body) >= self.minimum_size)
+        )
+
+        if not compressible:
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.compressor = _Compressor(self.encoding)
+        headers.add_vary_header("Accept-Encoding")
+        headers["content-encoding"] = self.encoding
+        compressed = await self.compressor.acompress(body, more_body)
+
+        if more_body:
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(len(compressed))
+
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
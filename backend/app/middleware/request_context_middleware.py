@@ -0,0 +1,54 @@
+"""Request Context Middleware (request id, route and latency for logs)"""
+import logging
+import time
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils import get_logger
+from app.utils.logger import request_id_var, request_scope_var, current_route
+
+logger = get_logger("app.access")
+
+
+class RequestContextMiddleware:
+    """
+    Binds a request id (from X-Request-ID or generated) and the request scope
+    to context variables so every log record carries them, echoes the id back
+    in the response and logs one access line with the route template and latency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        request_id_token = request_id_var.set(request_id)
+        scope_token = request_scope_var.set(scope)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["x-request-id"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%s %s %d", scope["method"], current_route(), status_code,
+                    extra={
+                        "method": scope["method"],
+                        "status_code": status_code,
+                        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                    }
+                )
+            request_scope_var.reset(scope_token)
+            request_id_var.reset(request_id_token)
@@ -1,6 +1,12 @@
 """Models Package"""
 from app.models.role import Role
 from app.models.user import User
-from app.models.task import Task
+from app.models.task import Task, ArchivedTask
+from app.models.task_activity import TaskActivity
+from app.models.account_deletion import AccountDeletion
+from app.models.shard import TaskShardAssignment, IdBlock
 
-__all__ = ["Role", "User", "Task"]
+__all__ = [
+    "Role", "User", "Task", "ArchivedTask", "TaskActivity", "AccountDeletion",
+    "TaskShardAssignment", "IdBlock"
+]
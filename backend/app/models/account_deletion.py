@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class AccountDeletion(Base):
+    __tablename__ = "account_deletions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    # Not a foreign key: the record outlives the user row it tracks
+    user_id = Column(Integer, unique=True, nullable=False, index=True)
+    status = Column(String(50), default="pending", index=True)
+    tasks_total = Column(Integer, default=0)
+    tasks_deleted = Column(Integer, default=0)
+    requested_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    # Failed purges are retried with backoff until they complete
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<AccountDeletion(user_id={self.user_id}, status={self.status})>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, false
+from datetime import datetime
+from app.database import Base
+
+
+class TaskShardAssignment(Base):
+    """Lookup table pinning each user's tasks to one shard (lives in the primary DB)"""
+    __tablename__ = "task_shard_assignments"
+    
+    user_id = Column(Integer, primary_key=True)
+    shard = Column(String(100), nullable=False, index=True)
+    # Set while move_user_tasks copies the user's rows; task writes are refused meanwhile
+    moving = Column(Boolean, nullable=False, default=False, server_default=false())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<TaskShardAssignment(user_id={self.user_id}, shard={self.shard}, moving={self.moving})>"
+
+
+class IdBlock(Base):
+    """Hi/lo allocator state for ids that must be unique across shards"""
+    __tablename__ = "id_blocks"
+    
+    name = Column(String(100), primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f"<IdBlock(name={self.name}, next_value={self.next_value})>"
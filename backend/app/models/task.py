@@ -6,18 +6,46 @@ from app.database import Base
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Archived tasks keep their id, so SQLite must never reuse one
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     status = Column(String(50), default="pending", index=True)
     priority = Column(String(50), default="medium")
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     is_completed = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     owner = relationship("User", back_populates="tasks")
     
+    # Every ORM UPDATE is issued as `... WHERE id = ? AND version = ?` and bumps
+    # the counter, so a concurrent write surfaces as StaleDataError instead of
+    # being silently overwritten
+    __mapper_args__ = {"version_id_col": version}
+    
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, owner_id={self.owner_id})>"
+
+
+class ArchivedTask(Base):
+    """Cold storage for completed tasks; rows move back to `tasks` when updated"""
+    __tablename__ = "tasks_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(String(50), default="completed")
+    priority = Column(String(50), default="medium")
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    is_completed = Column(Boolean, default=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ArchivedTask(id={self.id}, title={self.title}, owner_id={self.owner_id})>"
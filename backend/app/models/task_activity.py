@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Index
+from datetime import datetime
+from app.database import Base
+
+
+class TaskActivity(Base):
+    """One change to a task; rows are written in batches by the activity log"""
+    __tablename__ = "task_activity"
+    # History pages are read per task, newest first
+    __table_args__ = (Index("ix_task_activity_task_id_id", "task_id", "id"),)
+    
+    id = Column(Integer, primary_key=True)
+    # Not foreign keys: history outlives the task and lives on the owner's shard
+    task_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=False, index=True)
+    actor_id = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)
+    # {"field": [old, new], ...}
+    changes = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<TaskActivity(task_id={self.task_id}, action={self.action})>"
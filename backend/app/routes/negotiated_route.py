@@ -0,0 +1,84 @@
+"""Route class that renders response models straight to MessagePack"""
+import functools
+import inspect
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.responses import Response as StarletteResponse
+from app.utils.negotiation import MSGPACK_MEDIA_TYPE, encode_msgpack
+
+REQUEST_PARAM = "negotiation_request__"
+RESPONSE_PARAM = "negotiation_response__"
+NO_BODY_STATUS_CODES = {204, 304}
+
+
+class MsgpackResponse(StarletteResponse):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        return encode_msgpack(content)
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    When ContentNegotiationMiddleware picked MessagePack, the endpoint's return
+    value is validated against the response model and dumped in python mode,
+    so datetimes are packed as Timestamps instead of rendered to JSON and
+    transcoded. JSON requests go through FastAPI unchanged.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def _wrap(self, endpoint):
+        route = self
+        signature = inspect.signature(endpoint)
+        parameters = list(signature.parameters.values())
+        # FastAPI injects one Request/Response per endpoint: reuse the endpoint's own
+        injected = {}
+        for name, annotation in ((REQUEST_PARAM, Request), (RESPONSE_PARAM, Response)):
+            existing = next((p.name for p in parameters if p.annotation is annotation), None)
+            if existing is None:
+                parameters.append(inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation))
+            injected[annotation] = existing or name
+
+        @functools.wraps(endpoint)
+        async def negotiated_endpoint(**values):
+            request: Request = values[injected[Request]]
+            sub_response: Response = values[injected[Response]]
+            values.pop(REQUEST_PARAM, None)
+            values.pop(RESPONSE_PARAM, None)
+            result = await endpoint(**values)
+            if getattr(request.state, "response_media_type", None) != MSGPACK_MEDIA_TYPE:
+                return result
+            return route._render_msgpack(result, sub_response) or result
+
+        negotiated_endpoint.__signature__ = signature.replace(parameters=parameters)
+        return negotiated_endpoint
+
+    def _render_msgpack(self, result, sub_response: Response):
+        """MsgpackResponse for `result`, or None to leave it to FastAPI"""
+        status_code = sub_response.status_code or self.status_code or 200
+        if isinstance(result, StarletteResponse) or self.response_field is None or status_code in NO_BODY_STATUS_CODES:
+            return None
+
+        value, errors = self.response_field.validate(result, {}, loc=("response",))
+        if errors:
+            # FastAPI re-validates and raises its usual ResponseValidationError
+            return None
+
+        content = self.response_field.serialize(
+            value,
+            mode="python",
+            include=self.response_model_include,
+            exclude=self.response_model_exclude,
+            by_alias=self.response_model_by_alias,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )
+        response = MsgpackResponse(content, status_code=status_code)
+        # Headers the endpoint set on its injected Response (e.g. ETag)
+        response.raw_headers.extend(sub_response.headers.raw)
+        return response
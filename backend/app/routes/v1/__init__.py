@@ -2,10 +2,14 @@
 from fastapi import APIRouter
 from app.routes.v1.auth import router as auth_router
 from app.routes.v1.tasks import router as tasks_router
+from app.routes.v1.admin import router as admin_router
+from app.routes.v1.dashboard import router as dashboard_router
 
 # Combine all v1 routes
 v1_router = APIRouter()
 v1_router.include_router(auth_router)
 v1_router.include_router(tasks_router)
+v1_router.include_router(dashboard_router)
+v1_router.include_router(admin_router)
 
 __all__ = ["v1_router"]
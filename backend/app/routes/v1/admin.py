@@ -0,0 +1,72 @@
+"""Admin Routes"""
+import asyncio
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.routes.negotiated_route import NegotiatedRoute
+from app.routes.v1.dependencies import require_admin
+from app.schemas import TaskStatsResponse
+from app.services import TaskService
+from app.utils import get_logger
+from app.utils.profiler import ProfilerBusyError, sampling_profiler, to_collapsed, to_speedscope
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"], route_class=NegotiatedRoute)
+
+MAX_PROFILE_SECONDS = 60
+
+
+@router.get(
+    "/tasks/stats",
+    response_model=TaskStatsResponse,
+    summary="Task counts across all shards",
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Admin role required"}
+    }
+)
+async def get_task_stats(_: int = Depends(require_admin)):
+    return await TaskService.get_global_stats()
+
+
+@router.post(
+    "/profile",
+    summary="Sample this worker's stacks for a few seconds",
+    response_class=PlainTextResponse,
+    responses={
+        200: {
+            "description": "Collapsed stacks (text/plain) or a speedscope file (application/json)",
+            "content": {"text/plain": {}, "application/json": {}},
+        },
+        401: {"description": "Unauthorized"},
+        403: {"description": "Admin role required"},
+        409: {"description": "A profile is already running in this worker"}
+    }
+)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    include_idle: bool = Query(False),
+    admin_id: int = Depends(require_admin)
+):
+    """
+    Only the worker process that receives this request is profiled. Each stack
+    is prefixed with the route template it was serving, or `<thread name>` for
+    work outside a request.
+    """
+    try:
+        sampling_profiler.start(interval_ms / 1000, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    logger.info("Admin %s started a %.1fs profile", admin_id, seconds)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        samples = sampling_profiler.stop()
+
+    if format == "speedscope":
+        name = f"worker {os.getpid()} ({seconds:g}s @ {interval_ms:g}ms)"
+        return JSONResponse(to_speedscope(samples, interval_ms / 1000, name))
+    return PlainTextResponse(to_collapsed(samples))
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas import UserRegister, UserLogin, TokenResponse, UserResponse
-from app.services import AuthService
+from app.routes.negotiated_route import NegotiatedRoute
+from app.routes.v1.dependencies import get_current_user_id
+from app.schemas import UserRegister, UserLogin, TokenResponse, UserResponse, AccountDeletionResponse
+from app.services import AuthService, AccountService
 from app.utils import get_logger
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/api/v1/auth", tags=["authentication"])
+router = APIRouter(prefix="/api/v1/auth", tags=["authentication"], route_class=NegotiatedRoute)
 
 
 @router.post(
@@ -46,8 +48,57 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     }
 )
 async def get_current_user(
-    user_id: int,
     db: Session = Depends(get_db),
-    _: dict = Depends(lambda: None)
+    user_id: int = Depends(get_current_user_id)
 ):
     return AuthService.get_user_by_id(db, user_id)
+
+
+@router.post(
+    "/me/deactivate",
+    response_model=UserResponse,
+    summary="Deactivate the current account",
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "User not found"}
+    }
+)
+async def deactivate_current_user(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    return AccountService.deactivate_user(db, user_id)
+
+
+@router.delete(
+    "/me",
+    response_model=AccountDeletionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Delete the current account",
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "User not found"}
+    }
+)
+async def delete_current_user(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    # The background-jobs process picks the request up (purge_scheduler)
+    return AccountService.request_deletion(db, user_id)
+
+
+@router.get(
+    "/me/deletion",
+    response_model=AccountDeletionResponse,
+    summary="Get account deletion progress",
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "No deletion requested"}
+    }
+)
+async def get_deletion_status(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    return AccountService.get_deletion_status(db, user_id)
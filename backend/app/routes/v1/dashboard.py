@@ -0,0 +1,29 @@
+"""Dashboard Routes"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.routes.negotiated_route import NegotiatedRoute
+from app.routes.v1.dependencies import get_current_user_id
+from app.schemas import DashboardResponse
+from app.services import DashboardService
+from app.utils import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"], route_class=NegotiatedRoute)
+
+
+@router.get(
+    "",
+    response_model=DashboardResponse,
+    summary="Get profile, task counts and first page of tasks",
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "User not found"}
+    }
+)
+async def get_dashboard(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    return DashboardService.get_dashboard(db, user_id, limit)
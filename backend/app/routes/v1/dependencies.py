@@ -0,0 +1,77 @@
+"""Shared route dependencies"""
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status, Request
+from sqlalchemy.orm import Session
+from app.services import AccountService
+from app.sharding import shard_router
+
+MOVE_RETRY_AFTER_SECONDS = 5
+
+
+def get_current_user_id(request: Request) -> int:
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not authenticated"
+        )
+    return user_id
+
+
+def require_admin(request: Request) -> int:
+    user_id = get_current_user_id(request)
+    if getattr(request.state, "user_role", None) != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required"
+        )
+    return user_id
+
+
+def get_task_db(user_id: int = Depends(get_current_user_id)) -> Session:
+    """Dependency to get a session on the shard holding the user's tasks"""
+    db = shard_router.session_for(user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_task_write_db(user_id: int = Depends(get_current_user_id)) -> Session:
+    """
+    get_task_db for routes that write tasks, routed by the placement in the
+    primary DB rather than the cached one. Inactive or deleted accounts get
+    403, and users whose tasks are being moved to another shard get 503
+    """
+    AccountService.ensure_can_write(user_id)
+    shard, moving = shard_router.placement_for_write(user_id)
+    if moving:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Tasks are being moved, try again shortly",
+            headers={"Retry-After": str(MOVE_RETRY_AFTER_SECONDS)}
+        )
+
+    db = shard_router.session(shard)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """Task version from an If-Match header (`"3"`, `W/"3"` or `*`)"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        # An entity tag we never issued cannot match the current version
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not match the current task version"
+        )
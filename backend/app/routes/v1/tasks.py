@@ -1,23 +1,24 @@
 """Task Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
-from app.services import TaskService
+from app.routes.negotiated_route import NegotiatedRoute
+from app.routes.v1.dependencies import get_current_user_id, get_task_db, get_task_write_db, get_if_match_version
+from app.schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, ArchivedTaskListResponse,
+    TaskHistoryResponse
+)
+from app.services import TaskService, ArchiveService, ActivityService
 from app.utils import get_logger
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
+router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"], route_class=NegotiatedRoute)
 
 
-def get_current_user_id(request: Request) -> int:
-    user_id = getattr(request.state, "user_id", None)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not authenticated"
-        )
-    return user_id
+def set_etag(response: Response, task: TaskResponse) -> TaskResponse:
+    """Expose the task version as a strong ETag for use in If-Match"""
+    response.headers["ETag"] = f'"{task.version}"'
+    return task
 
 
 @router.post(
@@ -25,16 +26,45 @@ def get_current_user_id(request: Request) -> int:
     response_model=TaskResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new task",
-    responses={400: {"description": "Invalid input"}}
+    responses={
+        400: {"description": "Invalid input"},
+        403: {"description": "Account is inactive"},
+        503: {"description": "Tasks are being moved to another shard"}
+    }
 )
 async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_write_db),
     user_id: int = Depends(get_current_user_id)
 ):
     return TaskService.create_task(db, task_data, user_id)
 
 
+MAX_BATCH_IDS = 100
+
+
+def parse_task_ids(ids: Optional[list[str]] = Query(
+    None, description="Task ids for a batch lookup, comma-separated or repeated"
+)) -> Optional[list[int]]:
+    if not ids:
+        return None
+    
+    try:
+        task_ids = sorted({int(value) for raw in ids for value in raw.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be integers"
+        )
+    
+    if len(task_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_IDS} ids per request"
+        )
+    return task_ids
+
+
 @router.get(
     "",
     response_model=TaskListResponse,
@@ -44,14 +74,36 @@ async def create_task(
 async def get_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    task_ids: Optional[list[int]] = Depends(parse_task_ids),
+    db: Session = Depends(get_task_db),
     user_id: int = Depends(get_current_user_id)
 ):
+    if task_ids is not None:
+        tasks = TaskService.get_tasks_by_ids(db, user_id, task_ids)
+        return TaskListResponse(total=len(tasks), tasks=tasks)
+    
     tasks = TaskService.get_user_tasks(db, user_id, skip, limit)
     total = TaskService.get_task_count(db, user_id)
     return TaskListResponse(total=total, tasks=tasks)
 
 
+@router.get(
+    "/archive",
+    response_model=ArchivedTaskListResponse,
+    summary="Get user's archived tasks",
+    responses={401: {"description": "Unauthorized"}}
+)
+async def get_archived_tasks(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_task_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    tasks = ArchiveService.get_archived_tasks(db, user_id, skip, limit)
+    total = ArchiveService.get_archived_count(db, user_id)
+    return ArchivedTaskListResponse(total=total, tasks=tasks)
+
+
 @router.get(
     "/{task_id}",
     response_model=TaskResponse,
@@ -63,10 +115,31 @@ async def get_tasks(
 )
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    include_archived: bool = Query(False),
+    db: Session = Depends(get_task_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    return set_etag(response, TaskService.get_task(db, task_id, user_id, include_archived))
+
+
+@router.get(
+    "/{task_id}/history",
+    response_model=TaskHistoryResponse,
+    summary="Get a task's change history",
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "Task not found"}
+    }
+)
+async def get_task_history(
+    task_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_task_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    return TaskService.get_task(db, task_id, user_id)
+    return ActivityService.get_task_history(db, task_id, user_id, skip, limit)
 
 
 @router.put(
@@ -75,16 +148,21 @@ async def get_task(
     summary="Update a task",
     responses={
         401: {"description": "Unauthorized"},
-        404: {"description": "Task not found"}
+        403: {"description": "Account is inactive"},
+        404: {"description": "Task not found"},
+        412: {"description": "If-Match does not match the current task version"},
+        503: {"description": "Tasks are being moved to another shard"}
     }
 )
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    expected_version: Optional[int] = Depends(get_if_match_version),
+    db: Session = Depends(get_task_write_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    return TaskService.update_task(db, task_id, task_data, user_id)
+    return set_etag(response, TaskService.update_task(db, task_id, task_data, user_id, expected_version))
 
 
 @router.delete(
@@ -93,12 +171,14 @@ async def update_task(
     summary="Delete a task",
     responses={
         401: {"description": "Unauthorized"},
-        404: {"description": "Task not found"}
+        403: {"description": "Account is inactive"},
+        404: {"description": "Task not found"},
+        503: {"description": "Tasks are being moved to another shard"}
     }
 )
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_write_db),
     user_id: int = Depends(get_current_user_id)
 ):
     TaskService.delete_task(db, task_id, user_id)
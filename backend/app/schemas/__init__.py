@@ -1,12 +1,18 @@
 """Schemas Package"""
 from app.schemas.user import (
     UserRegister, UserLogin, UserResponse, 
-    TokenResponse, TokenData, RoleResponse
+    TokenResponse, TokenData, RoleResponse, AccountDeletionResponse
 )
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskStatsResponse,
+    ArchivedTaskResponse, ArchivedTaskListResponse, TaskActivityResponse, TaskHistoryResponse
+)
+from app.schemas.dashboard import DashboardResponse
 
 __all__ = [
     "UserRegister", "UserLogin", "UserResponse",
-    "TokenResponse", "TokenData", "RoleResponse",
-    "TaskCreate", "TaskUpdate", "TaskResponse", "TaskListResponse"
+    "TokenResponse", "TokenData", "RoleResponse", "AccountDeletionResponse",
+    "TaskCreate", "TaskUpdate", "TaskResponse", "TaskListResponse", "TaskStatsResponse",
+    "ArchivedTaskResponse", "ArchivedTaskListResponse", "TaskActivityResponse", "TaskHistoryResponse",
+    "DashboardResponse"
 ]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from app.schemas.user import UserResponse
+from app.schemas.task import TaskResponse
+
+
+class DashboardResponse(BaseModel):
+    """Everything the dashboard needs on load, in one response"""
+    user: UserResponse
+    total: int
+    status_counts: dict[str, int]
+    tasks: list[TaskResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 
 
@@ -34,6 +34,7 @@ class TaskResponse(BaseModel):
     is_completed: bool
     created_at: datetime
     updated_at: datetime
+    version: int
     
     class Config:
         from_attributes = True
@@ -42,3 +43,35 @@ class TaskResponse(BaseModel):
 class TaskListResponse(BaseModel):
     total: int
     tasks: list[TaskResponse]
+
+
+class ArchivedTaskResponse(TaskResponse):
+    archived_at: datetime
+
+
+class ArchivedTaskListResponse(BaseModel):
+    total: int
+    tasks: list[ArchivedTaskResponse]
+
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: dict[str, int]
+    by_shard: dict[str, int]
+
+
+class TaskActivityResponse(BaseModel):
+    id: int
+    task_id: int
+    actor_id: int
+    action: str
+    changes: Optional[dict[str, list[Any]]]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class TaskHistoryResponse(BaseModel):
+    total: int
+    events: list[TaskActivityResponse]
@@ -61,3 +61,16 @@ class TokenData(BaseModel):
     user_id: Optional[int] = None
     email: Optional[str] = None
     role: Optional[str] = None
+
+
+class AccountDeletionResponse(BaseModel):
+    """Progress of an asynchronous account purge"""
+    user_id: int
+    status: str
+    tasks_total: int
+    tasks_deleted: int
+    requested_at: datetime
+    completed_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
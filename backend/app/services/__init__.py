@@ -1,5 +1,12 @@
 """Services Package"""
 from app.services.auth_service import AuthService
 from app.services.task_service import TaskService
+from app.services.account_service import AccountService
+from app.services.archive_service import ArchiveService
+from app.services.dashboard_service import DashboardService
+from app.services.activity_service import ActivityService
 
-__all__ = ["AuthService", "TaskService"]
+__all__ = [
+    "AuthService", "TaskService", "AccountService", "ArchiveService", "DashboardService",
+    "ActivityService"
+]
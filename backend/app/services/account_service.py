@@ -0,0 +1,194 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import User, Task, ArchivedTask, TaskActivity, AccountDeletion
+from app.schemas import UserResponse, AccountDeletionResponse
+from app.sharding import shard_router
+from app.utils import get_logger
+from app.utils.scheduler import PeriodicJob
+from fastapi import HTTPException, status
+
+logger = get_logger(__name__)
+
+
+class AccountService:
+    @staticmethod
+    def _get_user(db: Session, user_id: int) -> User:
+        user = db.query(User).filter(User.id == user_id).first()
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        return user
+
+    @staticmethod
+    def deactivate_user(db: Session, user_id: int) -> UserResponse:
+        user = AccountService._get_user(db, user_id)
+        user.is_active = False
+        db.commit()
+        db.refresh(user)
+
+        logger.info("User deactivated: %s", user_id)
+        return UserResponse.model_validate(user)
+
+    @staticmethod
+    def request_deletion(db: Session, user_id: int) -> AccountDeletionResponse:
+        """Deactivate the account now; purge_scheduler runs purge_user shortly after"""
+        user = AccountService._get_user(db, user_id)
+
+        deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+        if not deletion:
+            task_db = shard_router.session_for(user_id)
+            try:
+                tasks_total = sum(
+                    task_db.query(model).filter(model.owner_id == user_id).count()
+                    for model in (Task, ArchivedTask)
+                )
+            finally:
+                task_db.close()
+            deletion = AccountDeletion(
+                user_id=user_id,
+                status="pending",
+                tasks_total=tasks_total,
+                tasks_deleted=0
+            )
+            db.add(deletion)
+        elif deletion.status == "failed":
+            deletion.status = "pending"
+
+        user.is_active = False
+        db.commit()
+        db.refresh(deletion)
+
+        logger.info("Account deletion requested: %s (%d tasks)", user_id, deletion.tasks_total)
+        return AccountDeletionResponse.model_validate(deletion)
+
+    @staticmethod
+    def get_deletion_status(db: Session, user_id: int) -> AccountDeletionResponse:
+        deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+
+        if not deletion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No deletion requested for this account"
+            )
+
+        return AccountDeletionResponse.model_validate(deletion)
+
+    @staticmethod
+    def purge_user(user_id: int, batch_size: int = None) -> None:
+        """
+        Delete a user's tasks in bounded batches, committing after each so no
+        transaction holds row locks for long, then drop the user row itself.
+        Runs outside the request cycle with its own sessions and is safe to re-run.
+        """
+        batch_size = batch_size or settings.ACCOUNT_PURGE_BATCH_SIZE
+        db = SessionLocal()
+        task_db = shard_router.session_for(user_id)
+
+        try:
+            deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+            if not deletion or deletion.status == "completed":
+                return
+
+            deletion.status = "running"
+            db.commit()
+
+            for model in (Task, ArchivedTask, TaskActivity):
+                while True:
+                    task_ids = [
+                        row.id for row in task_db.query(model.id)
+                        .filter(model.owner_id == user_id)
+                        .limit(batch_size)
+                        .all()
+                    ]
+                    if not task_ids:
+                        break
+
+                    task_db.query(model).filter(model.id.in_(task_ids)).delete(synchronize_session=False)
+                    task_db.commit()
+                    # Activity rows go too, but progress counts tasks only
+                    if model is not TaskActivity:
+                        deletion.tasks_deleted += len(task_ids)
+                        db.commit()
+
+                    if settings.ACCOUNT_PURGE_BATCH_PAUSE:
+                        time.sleep(settings.ACCOUNT_PURGE_BATCH_PAUSE)
+
+            db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+            deletion.status = "completed"
+            deletion.completed_at = datetime.utcnow()
+            db.commit()
+            shard_router.forget(user_id)
+
+            logger.info("Account purged: %s (%d tasks)", user_id, deletion.tasks_deleted)
+        except Exception as e:
+            logger.error("Account purge failed for user %s: %s", user_id, e)
+            task_db.rollback()
+            db.rollback()
+            deletion = db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+            deletion.status = "failed"
+            deletion.attempts += 1
+            deletion.next_attempt_at = datetime.utcnow() + timedelta(seconds=min(
+                settings.ACCOUNT_PURGE_RETRY_MAX_SECONDS,
+                settings.ACCOUNT_PURGE_POLL_SECONDS * 2 ** deletion.attempts
+            ))
+            db.commit()
+        finally:
+            task_db.close()
+            db.close()
+
+    @staticmethod
+    def ensure_can_write(user_id: int) -> None:
+        """
+        Tokens outlive deactivation, so task writes re-check the account. An
+        inactive, deleting or purged user must not add rows behind the purge.
+        """
+        db = SessionLocal()
+        try:
+            is_active = db.query(User.is_active).filter(User.id == user_id).scalar()
+        finally:
+            db.close()
+
+        if not is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account is inactive"
+            )
+
+    @staticmethod
+    def run_pending_purges() -> None:
+        """
+        Run every requested purge, including ones a dead process left running
+        and failed ones whose backoff has passed. The user cannot ask again once
+        their token expires (inactive accounts cannot log in), so failures are
+        never given up on.
+        """
+        db = SessionLocal()
+        try:
+            user_ids = [
+                row.user_id for row in db.query(AccountDeletion.user_id)
+                .filter(or_(
+                    AccountDeletion.status.in_(["pending", "running"]),
+                    (AccountDeletion.status == "failed") & (AccountDeletion.next_attempt_at <= datetime.utcnow())
+                ))
+                .all()
+            ]
+        finally:
+            db.close()
+
+        for user_id in user_ids:
+            AccountService.purge_user(user_id)
+
+
+# Polls in the process that owns background jobs, starting with requests an
+# earlier process left behind
+purge_scheduler = PeriodicJob(
+    "account-purger", settings.ACCOUNT_PURGE_POLL_SECONDS, AccountService.run_pending_purges, run_immediately=True
+)
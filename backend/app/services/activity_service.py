@@ -0,0 +1,167 @@
+"""Task activity log
+
+TaskService records each change once it has committed. Events go into a
+bounded in-process queue and a writer thread inserts them in multi-row batches
+per shard, whenever ACTIVITY_BATCH_SIZE events are waiting or
+ACTIVITY_FLUSH_INTERVAL has passed since the first one. stop() drains the queue
+before returning; it runs on app shutdown and again at interpreter exit.
+"""
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Task, ArchivedTask, TaskActivity
+from app.schemas import TaskActivityResponse, TaskHistoryResponse
+from app.sharding import shard_router
+from app.utils import get_logger
+from fastapi import HTTPException, status
+
+logger = get_logger(__name__)
+
+WRITE_ATTEMPTS = 3
+
+
+class ActivityLog:
+    def __init__(self, buffer_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="task-activity-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the writer and flush everything still buffered"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+        self._drain()
+
+    def record(self, task_id: int, owner_id: int, actor_id: int, action: str, changes: Optional[dict] = None):
+        if self._thread is None and not self._stop.is_set():
+            self.start()
+
+        event = {
+            "task_id": task_id,
+            "owner_id": owner_id,
+            "actor_id": actor_id,
+            "action": action,
+            "changes": changes,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            # Called from request handlers on the event loop, so never wait here
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # The writer is not keeping up; one inline insert rather than lose
+            # the event, without the writer's sleep-and-retry
+            logger.warning("Activity buffer full, writing event for task %s inline", task_id)
+            self._write([event], attempts=1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        self._drain()
+
+    def _collect(self) -> list[dict]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, events: list[dict], attempts: int = WRITE_ATTEMPTS):
+        by_shard: dict[str, list[dict]] = {}
+        for event in events:
+            by_shard.setdefault(shard_router.shard_for(event["owner_id"]), []).append(event)
+
+        for shard, rows in by_shard.items():
+            for attempt in range(1, attempts + 1):
+                db = shard_router.session(shard)
+                try:
+                    db.execute(insert(TaskActivity), rows)
+                    db.commit()
+                    break
+                except Exception as e:
+                    db.rollback()
+                    if attempt == attempts:
+                        logger.error("Lost %d activity events on shard %s: %s", len(rows), shard, e)
+                    else:
+                        time.sleep(attempt)
+                finally:
+                    db.close()
+
+
+activity_log = ActivityLog(
+    settings.ACTIVITY_BUFFER_SIZE, settings.ACTIVITY_BATCH_SIZE, settings.ACTIVITY_FLUSH_INTERVAL
+)
+atexit.register(activity_log.stop)
+
+
+class ActivityService:
+    @staticmethod
+    def get_task_history(
+        db: Session,
+        task_id: int,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20
+    ) -> TaskHistoryResponse:
+        """Newest first; history outlives the task, so deleted tasks still have one"""
+        query = db.query(TaskActivity).filter(
+            (TaskActivity.task_id == task_id) & (TaskActivity.owner_id == user_id)
+        )
+        total = query.count()
+
+        if not total and not any(
+            db.query(model.id).filter((model.id == task_id) & (model.owner_id == user_id)).first()
+            for model in (Task, ArchivedTask)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+
+        events = query.order_by(TaskActivity.id.desc()).offset(skip).limit(limit).all()
+        return TaskHistoryResponse(
+            total=total,
+            events=[TaskActivityResponse.model_validate(event) for event in events]
+        )
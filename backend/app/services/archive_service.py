@@ -0,0 +1,134 @@
+from collections.abc import Collection
+from datetime import datetime, timedelta
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Task, ArchivedTask
+from app.schemas import ArchivedTaskResponse
+from app.sharding import shard_router
+from app.utils import get_logger
+from app.utils.scheduler import PeriodicJob
+from fastapi import HTTPException, status
+
+logger = get_logger(__name__)
+
+TASK_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+class ArchiveService:
+    @staticmethod
+    def archive_completed(
+        db: Session,
+        older_than: datetime,
+        batch_size: int = None,
+        max_batches: int = None,
+        skip_owner_ids: Collection[int] = ()
+    ) -> int:
+        """
+        Move completed tasks last updated before `older_than` into tasks_archive,
+        one bounded batch per transaction, leaving `skip_owner_ids` alone (users
+        whose tasks are being moved between shards). Returns the number of rows moved.
+        """
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        max_batches = max_batches or settings.ARCHIVE_MAX_BATCHES_PER_RUN
+        moved = 0
+
+        archivable = (
+            or_(Task.is_completed.is_(True), Task.status == "completed"),
+            Task.updated_at < older_than,
+            Task.owner_id.not_in(skip_owner_ids),
+        )
+        tasks = Task.__table__
+
+        for _ in range(max_batches):
+            # Row locks keep the batch from changing until commit; rows another
+            # archiver (or a writer) holds are left for the next batch
+            task_ids = db.scalars(
+                select(Task.id).where(*archivable).limit(batch_size).with_for_update(skip_locked=True)
+            ).all()
+            if not task_ids:
+                break
+
+            # The predicate is checked again on delete, so a task reopened since
+            # the select stays put (SQLite takes no row locks)
+            rows = db.execute(
+                tasks.delete().where(tasks.c.id.in_(task_ids), *archivable).returning(*tasks.c)
+            ).mappings().all()
+            if rows:
+                archived_at = datetime.utcnow()
+                db.execute(insert(ArchivedTask), [{**row, "archived_at": archived_at} for row in rows])
+            db.commit()
+            moved += len(rows)
+
+        return moved
+
+    @staticmethod
+    def restore_task(db: Session, task_id: int, user_id: int) -> bool:
+        """Move an archived task back into the hot table; False if there is none"""
+        archived_columns = [getattr(ArchivedTask, name) for name in TASK_COLUMNS]
+        restored = db.execute(
+            insert(Task).from_select(
+                TASK_COLUMNS,
+                select(*archived_columns).where(
+                    (ArchivedTask.id == task_id) & (ArchivedTask.owner_id == user_id)
+                )
+            )
+        ).rowcount
+
+        if not restored:
+            db.rollback()
+            return False
+
+        db.query(ArchivedTask).filter(ArchivedTask.id == task_id).delete(synchronize_session=False)
+        db.commit()
+
+        logger.info("Task unarchived: %s by user %s", task_id, user_id)
+        return True
+
+    @staticmethod
+    def get_archived_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 10) -> list[ArchivedTaskResponse]:
+        tasks = db.query(ArchivedTask).filter(
+            ArchivedTask.owner_id == user_id
+        ).order_by(ArchivedTask.id.desc()).offset(skip).limit(limit).all()
+        return [ArchivedTaskResponse.model_validate(task) for task in tasks]
+
+    @staticmethod
+    def get_archived_count(db: Session, user_id: int) -> int:
+        return db.query(ArchivedTask).filter(ArchivedTask.owner_id == user_id).count()
+
+    @staticmethod
+    def get_archived_task(db: Session, task_id: int, user_id: int) -> ArchivedTaskResponse:
+        task = db.query(ArchivedTask).filter(
+            (ArchivedTask.id == task_id) & (ArchivedTask.owner_id == user_id)
+        ).first()
+
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+
+        return ArchivedTaskResponse.model_validate(task)
+
+    @staticmethod
+    def run_archival() -> int:
+        """One archival pass over every shard"""
+        cutoff = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        moved = 0
+
+        moving = shard_router.moving_user_ids() if shard_router.sharded else set()
+        for shard in shard_router.shard_names:
+            try:
+                moved += shard_router.run_on_shard(
+                    shard, lambda db: ArchiveService.archive_completed(db, cutoff, skip_owner_ids=moving)
+                )
+            except Exception as e:
+                logger.error("Archival failed on shard %s: %s", shard, e)
+
+        if moved:
+            logger.info("Archived %d completed tasks older than %s", moved, cutoff.date())
+        return moved
+
+
+# Runs in the process that owns background jobs (see app.bootstrap)
+archive_scheduler = PeriodicJob("task-archiver", settings.ARCHIVE_INTERVAL_SECONDS, ArchiveService.run_archival)
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, joinedload
 from app.models import User, Role
 from app.schemas import UserRegister, UserLogin, TokenResponse, UserResponse
 from app.utils import hash_password, verify_password, create_access_token, get_logger
@@ -7,6 +8,14 @@ from datetime import timedelta
 
 logger = get_logger(__name__)
 
+# Built once so logins reuse the compiled statement; the role is joined in
+# because the token needs it, which saves a lazy load per login
+USER_BY_EMAIL = (
+    select(User)
+    .options(joinedload(User.role))
+    .where(User.email == bindparam("email"))
+)
+
 
 class AuthService:
     @staticmethod
@@ -16,7 +25,7 @@ class AuthService:
         ).first()
         
         if existing_user:
-            logger.warning(f"Registration attempt with existing email: {user_data.email}")
+            logger.warning("Registration attempt with existing email: %s", user_data.email)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email or username already registered"
@@ -43,22 +52,22 @@ class AuthService:
         db.commit()
         db.refresh(new_user)
         
-        logger.info(f"User registered successfully: {user_data.email}")
+        logger.info("User registered successfully: %s", user_data.email)
         return UserResponse.model_validate(new_user)
     
     @staticmethod
     def login_user(db: Session, login_data: UserLogin) -> TokenResponse:
-        user = db.query(User).filter(User.email == login_data.email).first()
+        user = db.scalars(USER_BY_EMAIL, {"email": login_data.email}).first()
         
         if not user or not verify_password(login_data.password, user.hashed_password):
-            logger.warning(f"Failed login attempt for: {login_data.email}")
+            logger.warning("Failed login attempt for: %s", login_data.email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
         if not user.is_active:
-            logger.warning(f"Login attempt with inactive account: {login_data.email}")
+            logger.warning("Login attempt with inactive account: %s", login_data.email)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Account is inactive"
@@ -75,7 +84,7 @@ class AuthService:
             expires_delta=access_token_expires
         )
         
-        logger.info(f"User logged in successfully: {login_data.email}")
+        logger.info("User logged in successfully: %s", login_data.email)
         
         return TokenResponse(
             access_token=access_token,
@@ -84,7 +93,7 @@ class AuthService:
     
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> UserResponse:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
         
         if not user:
             raise HTTPException(
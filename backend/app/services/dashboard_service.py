@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from app.schemas import DashboardResponse
+from app.services.auth_service import AuthService
+from app.services.task_service import TaskService
+from app.sharding import shard_router
+
+
+class DashboardService:
+    @staticmethod
+    def _build(db: Session, task_db: Session, user_id: int, limit: int) -> DashboardResponse:
+        user = AuthService.get_user_by_id(db, user_id)
+        status_counts = TaskService.get_user_status_counts(task_db, user_id)
+        tasks = TaskService.get_user_tasks(task_db, user_id, 0, limit)
+        
+        return DashboardResponse(
+            user=user,
+            total=sum(status_counts.values()),
+            status_counts=status_counts,
+            tasks=tasks
+        )
+    
+    @staticmethod
+    def get_dashboard(db: Session, user_id: int, limit: int = 20) -> DashboardResponse:
+        """
+        Profile with role (one joined query), per-status counts and the first
+        page of tasks. The total is summed from the counts rather than queried
+        again. Unless the user's tasks live on another shard, all three queries
+        run on the request's single connection.
+        """
+        shard = shard_router.shard_for(user_id)
+        if shard_router.is_primary(shard):
+            return DashboardService._build(db, db, user_id, limit)
+        
+        task_db = shard_router.session(shard)
+        try:
+            return DashboardService._build(db, task_db, user_id, limit)
+        finally:
+            task_db.close()
@@ -1,16 +1,40 @@
+from typing import Optional
+from sqlalchemy import Integer, bindparam, func, select
 from sqlalchemy.orm import Session
-from app.models import Task
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from sqlalchemy.orm.exc import StaleDataError
+from app.models import Task, ArchivedTask
+from app.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskStatsResponse
+from app.sharding import shard_router
+from app.services.archive_service import ArchiveService
+from app.services.activity_service import activity_log
 from fastapi import HTTPException, status
 from app.utils import get_logger
 
 logger = get_logger(__name__)
 
+# Re-reads allowed when an update without If-Match loses a race
+UNCONDITIONAL_UPDATE_ATTEMPTS = 3
+
+# Hot read statements, built once. A statement object memoizes its cache key,
+# so each call goes straight to the compiled cache instead of rebuilding a
+# Query and hashing it; values are passed as bound parameters.
+USER_TASKS_PAGE = (
+    select(Task)
+    .where(Task.owner_id == bindparam("user_id"))
+    .offset(bindparam("skip", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+TASK_BY_ID = select(Task).where(
+    (Task.id == bindparam("task_id")) & (Task.owner_id == bindparam("user_id"))
+)
+USER_TASK_COUNT = select(func.count()).select_from(Task).where(Task.owner_id == bindparam("user_id"))
+
 
 class TaskService:
     @staticmethod
     def create_task(db: Session, task_data: TaskCreate, user_id: int) -> TaskResponse:
         new_task = Task(
+            id=shard_router.allocate_task_id(),
             title=task_data.title,
             description=task_data.description,
             priority=task_data.priority,
@@ -22,19 +46,32 @@ class TaskService:
         db.commit()
         db.refresh(new_task)
         
-        logger.info(f"Task created: {new_task.id} by user {user_id}")
+        activity_log.record(new_task.id, user_id, user_id, "created", {
+            field: [None, getattr(new_task, field)]
+            for field in ("title", "description", "status", "priority")
+        })
+        logger.info("Task created: %s by user %s", new_task.id, user_id)
         return TaskResponse.model_validate(new_task)
     
     @staticmethod
     def get_user_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 10) -> list[TaskResponse]:
-        tasks = db.query(Task).filter(Task.owner_id == user_id).offset(skip).limit(limit).all()
+        tasks = db.scalars(USER_TASKS_PAGE, {"user_id": user_id, "skip": skip, "limit": limit})
         return [TaskResponse.model_validate(task) for task in tasks]
     
     @staticmethod
-    def get_task(db: Session, task_id: int, user_id: int) -> TaskResponse:
-        task = db.query(Task).filter(
-            (Task.id == task_id) & (Task.owner_id == user_id)
-        ).first()
+    def get_tasks_by_ids(db: Session, user_id: int, task_ids: list[int]) -> list[TaskResponse]:
+        """Batch lookup in a single IN query; ids the user does not own are skipped"""
+        tasks = db.query(Task).filter(
+            (Task.owner_id == user_id) & (Task.id.in_(task_ids))
+        ).order_by(Task.id).all()
+        return [TaskResponse.model_validate(task) for task in tasks]
+    
+    @staticmethod
+    def get_task(db: Session, task_id: int, user_id: int, include_archived: bool = False) -> TaskResponse:
+        task = db.scalars(TASK_BY_ID, {"task_id": task_id, "user_id": user_id}).first()
+        
+        if not task and include_archived:
+            return ArchiveService.get_archived_task(db, task_id, user_id)
         
         if not task:
             raise HTTPException(
@@ -49,34 +86,87 @@ class TaskService:
         db: Session,
         task_id: int,
         task_data: TaskUpdate,
-        user_id: int
+        user_id: int,
+        expected_version: Optional[int] = None
     ) -> TaskResponse:
-        task = db.query(Task).filter(
-            (Task.id == task_id) & (Task.owner_id == user_id)
-        ).first()
-        
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
-        
+        """
+        Apply a partial update as one conditional UPDATE on (id, version).
+        With `expected_version` (from If-Match) a stale version is a 412; without
+        it a lost race is retried against the fresh row, so the last writer wins.
+        """
         update_data = task_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        restored = False
+        
+        for attempt in range(1, UNCONDITIONAL_UPDATE_ATTEMPTS + 1):
+            task = db.query(Task).filter(
+                (Task.id == task_id) & (Task.owner_id == user_id)
+            ).first()
+            
+            # Updating an archived task brings it back into the hot table, but
+            # only once If-Match has been checked against the archived version
+            if not task and expected_version is not None:
+                archived_version = db.query(ArchivedTask.version).filter(
+                    (ArchivedTask.id == task_id) & (ArchivedTask.owner_id == user_id)
+                ).scalar()
+                if archived_version is not None and archived_version != expected_version:
+                    TaskService._raise_version_mismatch(task_id)
+            if not task and ArchiveService.restore_task(db, task_id, user_id):
+                restored = True
+                task = db.query(Task).filter(Task.id == task_id).first()
+            
+            if not task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Task not found"
+                )
+            
+            if expected_version is not None and task.version != expected_version:
+                TaskService._raise_version_mismatch(task_id)
+            
+            changes = {
+                field: [getattr(task, field), value]
+                for field, value in update_data.items()
+                if getattr(task, field) != value
+            }
+            for field, value in update_data.items():
+                setattr(task, field, value)
+            
+            try:
+                db.commit()
+                break
+            except StaleDataError:
+                db.rollback()
+                if expected_version is not None or attempt == UNCONDITIONAL_UPDATE_ATTEMPTS:
+                    TaskService._raise_version_mismatch(task_id)
         
-        db.commit()
         db.refresh(task)
         
-        logger.info(f"Task updated: {task_id} by user {user_id}")
+        if restored:
+            activity_log.record(task_id, user_id, user_id, "restored")
+        if changes:
+            activity_log.record(task_id, user_id, user_id, "updated", changes)
+        logger.info("Task updated: %s by user %s", task_id, user_id)
         return TaskResponse.model_validate(task)
     
+    @staticmethod
+    def _raise_version_mismatch(task_id: int):
+        logger.info("Task update rejected (stale version): %s", task_id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was modified by another request; reload it and retry"
+        )
+    
     @staticmethod
     def delete_task(db: Session, task_id: int, user_id: int) -> bool:
         task = db.query(Task).filter(
             (Task.id == task_id) & (Task.owner_id == user_id)
         ).first()
         
+        if not task:
+            task = db.query(ArchivedTask).filter(
+                (ArchivedTask.id == task_id) & (ArchivedTask.owner_id == user_id)
+            ).first()
+        
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -86,10 +176,41 @@ class TaskService:
         db.delete(task)
         db.commit()
         
-        logger.info(f"Task deleted: {task_id} by user {user_id}")
+        activity_log.record(task_id, user_id, user_id, "deleted")
+        logger.info("Task deleted: %s by user %s", task_id, user_id)
         return True
     
     @staticmethod
     def get_task_count(db: Session, user_id: int) -> int:
         """Get total task count for a user"""
-        return db.query(Task).filter(Task.owner_id == user_id).count()
+        return db.scalar(USER_TASK_COUNT, {"user_id": user_id})
+    
+    @staticmethod
+    def get_user_status_counts(db: Session, user_id: int) -> dict[str, int]:
+        """Task count per status for one user"""
+        rows = db.query(Task.status, func.count(Task.id)).filter(
+            Task.owner_id == user_id
+        ).group_by(Task.status).all()
+        return {task_status: count for task_status, count in rows}
+    
+    @staticmethod
+    def get_status_counts(db: Session) -> dict[str, int]:
+        """Task count per status across all users in one database"""
+        rows = db.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
+        return {task_status: count for task_status, count in rows}
+    
+    @staticmethod
+    async def get_global_stats() -> TaskStatsResponse:
+        """Aggregate status counts from every shard, queried concurrently"""
+        per_shard = await shard_router.fan_out(TaskService.get_status_counts)
+        
+        by_status = {}
+        for counts in per_shard.values():
+            for task_status, count in counts.items():
+                by_status[task_status] = by_status.get(task_status, 0) + count
+        
+        return TaskStatsResponse(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            by_shard={shard: sum(counts.values()) for shard, counts in per_shard.items()}
+        )
@@ -0,0 +1,398 @@
+"""Task Shard Routing
+
+Tasks are partitioned across databases by owner_id. Each user is pinned to a
+shard through the task_shard_assignments lookup table in the primary DB; new
+users are placed with a consistent hash ring, so adding a shard never strands
+existing data and the rebalancer can move users one at a time.
+"""
+import asyncio
+import bisect
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateTable, CreateIndex
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import engine, engine_options, SessionLocal
+from app.models import Task, ArchivedTask, TaskActivity, TaskShardAssignment, IdBlock
+from app.utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SHARD = "default"
+
+# Tables stored on every shard, keyed by owner_id. Foreign keys into the
+# primary DB are not created on the shards.
+SHARDED_TABLES = [Task.__table__, ArchivedTask.__table__, TaskActivity.__table__]
+# Ids from each shard's own autoincrement, so they overlap across shards and
+# rows get fresh ids when they move
+LOCAL_ID_TABLES = {TaskActivity.__table__.name}
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], virtual_nodes: int):
+        self._ring = sorted(
+            (self._hash(f"{node}#{i}"), node)
+            for node in nodes
+            for i in range(virtual_nodes)
+        )
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def get_node(self, key) -> str:
+        index = bisect.bisect(self._keys, self._hash(str(key))) % len(self._keys)
+        return self._ring[index][1]
+
+
+class TaskIdAllocator:
+    """Hands out task ids from blocks reserved in the primary DB (hi/lo)"""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0
+
+    def next_id(self, router: "ShardRouter") -> int:
+        with self._lock:
+            if self._next >= self._limit:
+                self._next, self._limit = self._reserve_block(router)
+            value = self._next
+            self._next += 1
+            return value
+
+    def _reserve_block(self, router: "ShardRouter") -> tuple[int, int]:
+        db = SessionLocal()
+        try:
+            # A single UPDATE takes the row lock before we read the new value
+            updated = db.query(IdBlock).filter(IdBlock.name == Task.__tablename__).update(
+                {IdBlock.next_value: IdBlock.next_value + self.block_size},
+                synchronize_session=False
+            )
+            if updated:
+                end = db.query(IdBlock.next_value).filter(IdBlock.name == Task.__tablename__).scalar()
+            else:
+                end = router.max_task_id() + 1 + self.block_size
+                db.add(IdBlock(name=Task.__tablename__, next_value=end))
+            db.commit()
+            return end - self.block_size, end
+        except IntegrityError:
+            db.rollback()
+            return self._reserve_block(router)
+        finally:
+            db.close()
+
+
+class ShardRouter:
+    def __init__(self, shard_urls: dict[str, str]):
+        if not shard_urls:
+            shard_urls = {DEFAULT_SHARD: settings.DATABASE_URL}
+
+        self.engines = {}
+        self.sessionmakers = {}
+        for name, url in shard_urls.items():
+            if url == settings.DATABASE_URL:
+                shard_engine = engine
+            else:
+                shard_engine = create_engine(url, **engine_options(url))
+            self.engines[name] = shard_engine
+            self.sessionmakers[name] = sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+
+        self.ring = HashRing(list(self.engines), settings.SHARD_VIRTUAL_NODES)
+        self.id_allocator = TaskIdAllocator(settings.TASK_ID_BLOCK_SIZE)
+        self._assignments: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._refreshed_at: Optional[datetime] = None
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    @property
+    def shard_names(self) -> list[str]:
+        return list(self.engines)
+
+    def is_primary(self, shard: str) -> bool:
+        return self.engines[shard] is engine
+
+    def session(self, shard: str) -> Session:
+        return self.sessionmakers[shard]()
+
+    def session_for(self, user_id: int) -> Session:
+        return self.session(self.shard_for(user_id))
+
+    def shard_for(self, user_id: int) -> str:
+        if not self.sharded:
+            return self.shard_names[0]
+
+        self._refresh_assignments()
+        shard = self._assignments.get(user_id)
+        if shard is None:
+            shard = self._load(user_id)
+        return shard
+
+    def placement_for_write(self, user_id: int) -> tuple[str, bool]:
+        """
+        (shard, moving) read from the primary DB rather than this worker's
+        cache, assigning a shard on the user's first write. A stale cache may
+        serve reads, since move_user_tasks keeps the source rows until every
+        worker has refreshed, but a write routed by it could be lost.
+        """
+        if not self.sharded:
+            return self.shard_names[0], False
+
+        db = SessionLocal()
+        try:
+            assignment = db.query(TaskShardAssignment).filter(
+                TaskShardAssignment.user_id == user_id
+            ).first()
+            if not assignment:
+                assignment = TaskShardAssignment(user_id=user_id, shard=self.ring.get_node(user_id))
+                db.add(assignment)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    assignment = db.query(TaskShardAssignment).filter(
+                        TaskShardAssignment.user_id == user_id
+                    ).first()
+            shard, moving = assignment.shard, assignment.moving
+        finally:
+            db.close()
+
+        self._assignments[user_id] = shard
+        return shard, moving
+
+    def moving_user_ids(self) -> set[int]:
+        """Users mid-move, read from the primary DB rather than this process's cache"""
+        db = SessionLocal()
+        try:
+            return {
+                row.user_id for row in db.query(TaskShardAssignment.user_id)
+                .filter(TaskShardAssignment.moving.is_(True))
+            }
+        finally:
+            db.close()
+
+    def allocate_task_id(self) -> Optional[int]:
+        """Globally unique task id, or None to let a single DB autoincrement"""
+        if not self.sharded:
+            return None
+        return self.id_allocator.next_id(self)
+
+    def _load(self, user_id: int) -> str:
+        """
+        Placement for reads. Users without an assignment have no tasks yet,
+        so the ring's choice is returned without recording (or caching) it;
+        a read must not recreate the entry forget() dropped for a purged user.
+        """
+        db = SessionLocal()
+        try:
+            shard = db.query(TaskShardAssignment.shard).filter(
+                TaskShardAssignment.user_id == user_id
+            ).scalar()
+        finally:
+            db.close()
+
+        if shard is None:
+            return self.ring.get_node(user_id)
+        self._assignments[user_id] = shard
+        return shard
+
+    def _refresh_assignments(self):
+        """Pick up moves made by other processes since the last refresh"""
+        now = datetime.utcnow()
+        if self._refreshed_at and now - self._refreshed_at < timedelta(seconds=settings.SHARD_MAP_REFRESH_SECONDS):
+            return
+
+        # Threads that lose the race wait for the refresh in progress rather
+        # than route with the stale map
+        with self._lock:
+            if self._refreshed_at and now - self._refreshed_at < timedelta(seconds=settings.SHARD_MAP_REFRESH_SECONDS):
+                return
+            # The cache fills lazily, so only entries changed since the last
+            # refresh need reloading (with a second of overlap for clock skew)
+            if self._refreshed_at:
+                db = SessionLocal()
+                try:
+                    rows = db.query(TaskShardAssignment.user_id, TaskShardAssignment.shard).filter(
+                        TaskShardAssignment.updated_at >= self._refreshed_at - timedelta(seconds=1)
+                    ).all()
+                finally:
+                    db.close()
+                for row in rows:
+                    self._assignments[row.user_id] = row.shard
+            self._refreshed_at = now
+
+    def assign(self, user_id: int, shard: str, moving: bool = False):
+        if shard not in self.engines:
+            raise ValueError(f"Unknown shard: {shard}")
+
+        db = SessionLocal()
+        try:
+            assignment = db.query(TaskShardAssignment).filter(
+                TaskShardAssignment.user_id == user_id
+            ).first()
+            if assignment:
+                assignment.shard = shard
+                assignment.moving = moving
+                assignment.updated_at = datetime.utcnow()
+            else:
+                db.add(TaskShardAssignment(user_id=user_id, shard=shard, moving=moving))
+            db.commit()
+        finally:
+            db.close()
+
+        self._assignments[user_id] = shard
+
+    def forget(self, user_id: int):
+        db = SessionLocal()
+        try:
+            db.query(TaskShardAssignment).filter(
+                TaskShardAssignment.user_id == user_id
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+        self._assignments.pop(user_id, None)
+
+    def create_schema(self):
+        """Create the sharded tables on every shard other than the primary DB"""
+        for name, shard_engine in self.engines.items():
+            if shard_engine is engine:
+                continue
+            with shard_engine.begin() as conn:
+                inspector = inspect(conn)
+                for table in SHARDED_TABLES:
+                    if inspector.has_table(table.name):
+                        continue
+                    conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+                    for index in table.indexes:
+                        conn.execute(CreateIndex(index))
+            logger.info("✓ Shard schema created/verified: %s", name)
+
+    def max_task_id(self) -> int:
+        highest = 0
+        for name in self.engines:
+            db = self.session(name)
+            try:
+                for model in (Task, ArchivedTask):
+                    highest = max(highest, db.query(func.max(model.id)).scalar() or 0)
+            finally:
+                db.close()
+        return highest
+
+    def run_on_shard(self, shard: str, operation: Callable[[Session], object]):
+        db = self.session(shard)
+        try:
+            return operation(db)
+        finally:
+            db.close()
+
+    async def fan_out(self, operation: Callable[[Session], object]) -> dict[str, object]:
+        """Run a read-only operation on every shard concurrently"""
+        results = await asyncio.gather(*(
+            run_in_threadpool(self.run_on_shard, name, operation)
+            for name in self.engines
+        ))
+        return dict(zip(self.engines, results))
+
+
+shard_router = ShardRouter(settings.TASK_SHARDS)
+
+
+def _copy_owner_rows(user_id: int, source: str, target: str, batch_size: int) -> int:
+    # Clear what an earlier, failed move left behind, so re-runs stay
+    # idempotent. Only by owner_id: activity ids on the target belong to others
+    with shard_router.engines[target].begin() as dst:
+        for table in SHARDED_TABLES:
+            dst.execute(table.delete().where(table.c.owner_id == user_id))
+
+    copied = 0
+    for table in SHARDED_TABLES:
+        last_id = 0
+        while True:
+            with shard_router.engines[source].connect() as src:
+                rows = [
+                    dict(row._mapping) for row in src.execute(
+                        select(table)
+                        .where(table.c.owner_id == user_id, table.c.id > last_id)
+                        .order_by(table.c.id)
+                        .limit(batch_size)
+                    )
+                ]
+            if not rows:
+                break
+
+            last_id = rows[-1]["id"]
+            if table.name in LOCAL_ID_TABLES:
+                # Rows are read in id order, so fresh ids keep their order
+                for row in rows:
+                    del row["id"]
+            with shard_router.engines[target].begin() as dst:
+                dst.execute(table.insert(), rows)
+
+            copied += len(rows)
+    return copied
+
+
+def _delete_owner_rows(user_id: int, shard: str, batch_size: int):
+    for table in SHARDED_TABLES:
+        while True:
+            with shard_router.engines[shard].begin() as conn:
+                ids = conn.execute(
+                    select(table.c.id).where(table.c.owner_id == user_id).limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                conn.execute(table.delete().where(table.c.id.in_(ids)))
+
+
+def move_user_tasks(
+    user_id: int,
+    target: str,
+    batch_size: int = 1000,
+    settle_seconds: Optional[float] = None
+) -> int:
+    """
+    Move a user's rows to another shard. The user is first marked as moving;
+    task writes read that from the primary DB and are refused with 503, and
+    the wait lets writes already past that check finish. The source is then
+    quiet, so one copy is complete. The lookup entry flips to the target, and
+    the source rows are deleted once every worker's cached map (used for
+    reads) has picked up the flip. A move that dies midway leaves the user
+    marked as moving; running it again finishes it. Returns the rows copied.
+    """
+    source = shard_router.shard_for(user_id)
+    if target not in shard_router.engines:
+        raise ValueError(f"Unknown shard: {target}")
+    if source == target:
+        return 0
+
+    if settle_seconds is None:
+        settle_seconds = settings.SHARD_MAP_REFRESH_SECONDS
+
+    shard_router.assign(user_id, source, moving=True)
+    try:
+        # Writes that passed the moving check just before it was set finish meanwhile
+        time.sleep(settle_seconds)
+        copied = _copy_owner_rows(user_id, source, target, batch_size)
+    except BaseException:
+        shard_router.assign(user_id, source)
+        raise
+    shard_router.assign(user_id, target)
+
+    time.sleep(settle_seconds)
+    _delete_owner_rows(user_id, source, batch_size)
+
+    logger.info("Moved user %s from shard %s to %s (%d rows)", user_id, source, target, copied)
+    return copied
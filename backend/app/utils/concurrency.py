@@ -0,0 +1,91 @@
+"""Adaptive concurrency limiting (AIMD)"""
+import math
+import time
+from typing import Optional
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit that grows by roughly one slot per window of requests
+    finishing under the latency target and shrinks multiplicatively when they
+    do not, or when the caller reports overload (e.g. a saturated DB pool).
+    Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff_ratio: float
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self._last_decrease = 0.0
+
+    def try_acquire(self, share: float = 1.0) -> bool:
+        """Take a slot if fewer than `share` of the limit are in flight"""
+        if self.in_flight >= max(1, int(self.limit * share)):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: Optional[float]):
+        """Free a slot; a latency of None (long-running by design) leaves the limit alone"""
+        self.in_flight -= 1
+        if latency is None:
+            return
+        self.latency_ewma = latency if not self.latency_ewma else 0.9 * self.latency_ewma + 0.1 * latency
+
+        if latency > self.latency_target:
+            self.decrease()
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually in use
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def decrease(self):
+        now = time.monotonic()
+        # At most one cut per latency window, so one slow burst counts once
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait, from recent latency"""
+        return min(30, max(1, math.ceil(2 * self.latency_ewma)))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency_ewma * 1000, 2),
+        }
+
+
+class PriorityRules:
+    """Maps a request to a priority from "[METHOD ]path" rules; longest match wins"""
+
+    def __init__(self, rules: dict[str, str], default: str = "normal"):
+        self.default = default
+        self._rules: list[tuple[Optional[str], str, bool, str]] = []
+        for rule, priority in rules.items():
+            method, _, path = rule.rpartition(" ")
+            prefix = path.endswith("*")
+            self._rules.append((method.upper() or None, path.rstrip("*"), prefix, priority))
+        # Longest path first, method-specific before method-agnostic
+        self._rules.sort(key=lambda r: (len(r[1]), r[0] is not None), reverse=True)
+
+    def priority_for(self, method: str, path: str) -> str:
+        for rule_method, rule_path, prefix, priority in self._rules:
+            if rule_method and rule_method != method:
+                continue
+            if path == rule_path or (prefix and path.startswith(rule_path)):
+                return priority
+        return self.default
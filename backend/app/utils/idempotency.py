@@ -0,0 +1,85 @@
+"""Idempotency-Key storage
+
+A record is created when the first request with a key arrives and completed
+with the serialized response once it finishes. Duplicates either wait for the
+in-flight original or are replayed from the stored response.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    expires_at: float
+    response: Optional[StoredResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class IdempotencyStore:
+    """
+    Store interface used by IdempotencyMiddleware. The in-memory store covers
+    one process; a shared backend implements the same calls to dedupe across
+    workers.
+    """
+
+    async def begin(self, key: str, fingerprint: str) -> tuple[IdempotencyRecord, bool]:
+        """Existing record for `key`, or a new in-flight one; the flag is True if new"""
+        raise NotImplementedError
+
+    async def complete(self, key: str, response: StoredResponse):
+        raise NotImplementedError
+
+    async def release(self, key: str):
+        """Forget an in-flight key whose request failed, so a retry runs again"""
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store bounded by TTL and key count; event-loop only, so no locking"""
+
+    def __init__(self, ttl: float, max_keys: int):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._records: OrderedDict[str, IdempotencyRecord] = OrderedDict()
+
+    async def begin(self, key: str, fingerprint: str) -> tuple[IdempotencyRecord, bool]:
+        self._evict()
+        record = self._records.get(key)
+        if record is not None:
+            return record, False
+
+        record = IdempotencyRecord(fingerprint=fingerprint, expires_at=time.monotonic() + self.ttl)
+        self._records[key] = record
+        return record, True
+
+    async def complete(self, key: str, response: StoredResponse):
+        record = self._records.get(key)
+        if record is not None:
+            record.response = response
+            record.done.set()
+
+    async def release(self, key: str):
+        record = self._records.pop(key, None)
+        if record is not None:
+            record.done.set()
+
+    def _evict(self):
+        now = time.monotonic()
+        # Records are kept in insertion order, which is also expiry order
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if record.expires_at > now and len(self._records) < self.max_keys:
+                break
+            self._records.popitem(last=False)
+            record.done.set()
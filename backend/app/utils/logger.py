@@ -1,24 +1,158 @@
+"""Non-blocking structured logging
+
+Records from every `app.*` logger go through a bounded in-memory queue to a
+background QueueListener that writes JSON lines to stdout, so a slow log
+collector never blocks a request. When the queue is full records are dropped
+(and counted) instead of waiting. High-volume loggers can be sampled through
+LOG_SAMPLE_RATES; warnings and errors are never sampled out.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
 from app.config import settings
 
-logger = logging.getLogger(__name__)
+APP_LOGGER_NAME = "app"
+
+# Set per request by RequestContextMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+request_scope_var: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """Matched route path (e.g. /api/v1/tasks/{task_id}), else the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path")
+
+
+def current_route() -> Optional[str]:
+    scope = request_scope_var.get()
+    if scope is None:
+        return None
+    return route_template(scope)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps request id and route on the record in the emitting thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.route = current_route()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records per logger (longest name prefix wins)"""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, Optional[float]] = {}
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name not in self._resolved:
+            rate = None
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate_for(record.name)
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: full queue means the record is dropped"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread, not the request thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                self._put(self._dropped_record(dropped))
+        self._put(record)
+
+    def _put(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    @staticmethod
+    def _dropped_record(count: int) -> logging.LogRecord:
+        return logging.LogRecord(
+            APP_LOGGER_NAME, logging.WARNING, __file__, 0,
+            "Dropped %d log records (queue full)", (count,), None
+        )
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("request_id", "route", "method", "status_code", "latency_ms"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _configure() -> logging.handlers.QueueListener:
+    log_level = getattr(logging, settings.LOG_LEVEL, logging.INFO)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
 
-log_level = getattr(logging, settings.LOG_LEVEL, logging.INFO)
-logger.setLevel(log_level)
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    queue_handler.addFilter(RequestContextFilter())
 
-handler = logging.StreamHandler(sys.stdout)
-handler.setLevel(log_level)
+    app_logger = logging.getLogger(APP_LOGGER_NAME)
+    app_logger.setLevel(log_level)
+    app_logger.propagate = False
+    if not app_logger.handlers:
+        app_logger.addHandler(queue_handler)
 
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    # Flush whatever is still queued on a graceful exit
+    atexit.register(listener.stop)
+    return listener
 
-handler.setFormatter(formatter)
 
-if not logger.handlers:
-    logger.addHandler(handler)
+listener = _configure()
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,87 @@
+"""Content negotiation helpers for compact response formats"""
+import json
+from datetime import datetime, timezone
+from typing import Optional
+import msgpack
+from pydantic_core import to_jsonable_python
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+
+def _parse_header_values(header: Optional[str]) -> list[tuple[str, float]]:
+    values = []
+    if not header:
+        return values
+
+    for part in header.split(","):
+        value, _, params = part.strip().partition(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        values.append((value, quality))
+
+    return values
+
+
+def negotiate_media_type(accept_header: Optional[str]) -> str:
+    """Return MessagePack only when the client ranks it at least as high as JSON"""
+    msgpack_quality = 0.0
+    json_quality = 0.0
+
+    for value, quality in _parse_header_values(accept_header):
+        if value in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif value in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+
+    if msgpack_quality > 0 and msgpack_quality >= json_quality:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported Content-Encoding, preferring brotli on ties"""
+    qualities = dict(_parse_header_values(accept_encoding))
+    wildcard = qualities.get("*", 0.0)
+
+    best = None
+    best_quality = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime):
+        # Naive datetimes in this app are UTC; aware ones go out as Timestamps
+        return value.replace(tzinfo=timezone.utc)
+    return to_jsonable_python(value)
+
+
+def encode_msgpack(content) -> bytes:
+    """Pack python-mode model data; datetimes become the Timestamp extension type"""
+    return msgpack.packb(content, use_bin_type=True, datetime=True, default=_msgpack_default)
+
+
+def json_to_msgpack(body: bytes) -> bytes:
+    """
+    Transcode an already rendered JSON body to MessagePack. Only the fallback
+    for responses that did not come from a response model (errors, plain dicts).
+    """
+    return encode_msgpack(json.loads(body))
@@ -0,0 +1,151 @@
+"""In-process sampling profiler
+
+While running, a daemon thread snapshots every thread's Python stack with
+sys._current_frames() at a fixed interval and tags each sample with the route
+template of the request that thread is working on. Nothing is installed when
+it is not running, so it costs nothing when off.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from contextvars import Context
+from types import FrameType
+from typing import Optional
+from app.utils.logger import request_scope_var, route_template
+
+# Leaf frames that mean the thread is parked rather than burning CPU
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+MAX_DEPTH = 128
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.samples: Counter = Counter()
+        self.interval = 0.0
+        self.include_idle = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float, include_idle: bool = False):
+        with self._lock:
+            if self._thread is not None:
+                raise ProfilerBusyError("A profile is already running in this worker")
+            self.samples = Counter()
+            self.interval = interval
+            self.include_idle = include_idle
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling; returns {(route, frame, ...): count} with frames root first"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return self.samples
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not self.include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack, route = self._walk(frame)
+                if route is None:
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    route = f"<thread {names.get(thread_id, thread_id)}>"
+                self.samples[(route,) + stack] += 1
+
+    @staticmethod
+    def _walk(frame: FrameType) -> tuple[tuple[str, ...], Optional[str]]:
+        labels = []
+        route = None
+        while frame is not None and len(labels) < MAX_DEPTH:
+            code = frame.f_code
+            labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            if route is None:
+                route = SamplingProfiler._route_in_frame(frame)
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels), route
+
+    @staticmethod
+    def _route_in_frame(frame: FrameType) -> Optional[str]:
+        # Only frames that declare these names are inspected, which keeps
+        # f_locals (a dict copy) off the common path
+        varnames = frame.f_code.co_varnames
+        if "scope" in varnames:
+            scope = frame.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") == "http":
+                return route_template(scope)
+        if "context" in varnames:
+            # Threadpool workers run sync handlers inside the request's copied context
+            context = frame.f_locals.get("context")
+            if isinstance(context, Context):
+                scope = context.get(request_scope_var)
+                if scope is not None:
+                    return route_template(scope)
+        return None
+
+
+def to_collapsed(samples: Counter) -> str:
+    """Brendan Gregg's folded format: `route;frame;...;leaf count` per line"""
+    return "".join(
+        f"{';'.join(stack)} {count}\n"
+        for stack, count in sorted(samples.items(), key=lambda item: -item[1])
+    )
+
+
+def to_speedscope(samples: Counter, interval: float, name: str) -> dict:
+    """speedscope file with one sampled profile per route"""
+    frames: list[dict] = []
+    frame_index: dict[str, int] = {}
+    profiles: dict[str, dict] = {}
+    weight = round(interval * 1000, 3)
+
+    for (route, *stack), count in samples.items():
+        indexes = []
+        for label in stack:
+            if label not in frame_index:
+                frame_index[label] = len(frames)
+                func, _, location = label.partition(" (")
+                file, _, line = location.rstrip(")").rpartition(":")
+                frames.append({"name": func, "file": file, "line": int(line)})
+            indexes.append(frame_index[label])
+
+        profile = profiles.setdefault(route, {
+            "type": "sampled", "name": route, "unit": "milliseconds",
+            "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+        })
+        profile["samples"].append(indexes)
+        profile["weights"].append(weight * count)
+        profile["endValue"] += weight * count
+
+    ordered = sorted(profiles.values(), key=lambda p: -p["endValue"])
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "task-api sampling profiler",
+        "shared": {"frames": frames},
+        "profiles": ordered,
+    }
+
+
+sampling_profiler = SamplingProfiler()
+
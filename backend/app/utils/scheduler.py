@@ -0,0 +1,41 @@
+"""Periodic background jobs on daemon threads"""
+import threading
+from typing import Callable
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicJob:
+    """
+    Calls `job` every `interval` seconds on a daemon thread, first right away
+    when `run_immediately` is set. A failing run is logged and the next one
+    still happens, so one bad pass never ends the thread.
+    """
+
+    def __init__(self, name: str, interval: float, job: Callable[[], object], run_immediately: bool = False):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.run_immediately = run_immediately
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        if not self.run_immediately and self._stop.wait(self.interval):
+            return
+        while True:
+            try:
+                self.job()
+            except Exception as e:
+                logger.error("Background job %s failed: %s", self.name, e)
+            if self._stop.wait(self.interval):
+                return
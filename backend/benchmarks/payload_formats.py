@@ -0,0 +1,84 @@
+"""Payload size and encode cost for each negotiated response format"""
+import argparse
+import gzip
+import time
+from datetime import datetime, timedelta
+import brotli
+from app.config import settings
+from app.schemas import TaskResponse, TaskListResponse, UserResponse, RoleResponse, TokenResponse
+from app.utils.negotiation import encode_msgpack
+
+
+def build_task_list(count: int) -> TaskListResponse:
+    now = datetime.utcnow()
+    tasks = [
+        TaskResponse(
+            id=i,
+            title=f"Task number {i}",
+            description="Finish the quarterly project report and send it for review",
+            status=("pending", "in_progress", "completed")[i % 3],
+            priority=("low", "medium", "high")[i % 3],
+            owner_id=1,
+            is_completed=i % 3 == 2,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            version=1,
+        )
+        for i in range(count)
+    ]
+    return TaskListResponse(total=count, tasks=tasks)
+
+
+def build_token_response() -> TokenResponse:
+    now = datetime.utcnow()
+    role = RoleResponse(id=1, name="user", description="Regular user", created_at=now)
+    user = UserResponse(
+        id=1, email="john@example.com", username="johndoe", full_name="John Doe",
+        is_active=True, role=role, created_at=now, updated_at=now
+    )
+    return TokenResponse(access_token="x" * 180, user=user)
+
+
+def _timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1e6
+
+
+def measure(name: str, model, repeat: int) -> list[tuple]:
+    json_body, json_us = _timed(lambda: model.model_dump_json().encode(), repeat)
+    # NegotiatedRoute packs the python-mode dump directly (datetimes as Timestamps)
+    msgpack_body, msgpack_us = _timed(lambda: encode_msgpack(model.model_dump()), repeat)
+
+    rows = [
+        (name, "json", len(json_body), json_us),
+        (name, "msgpack", len(msgpack_body), msgpack_us),
+    ]
+    for label, body, base_us in (("json", json_body, json_us), ("msgpack", msgpack_body, msgpack_us)):
+        gz, gz_us = _timed(lambda: gzip.compress(body, settings.GZIP_COMPRESSION_LEVEL), repeat)
+        br, br_us = _timed(lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY), repeat)
+        rows.append((name, f"{label}+gzip", len(gz), base_us + gz_us))
+        rows.append((name, f"{label}+br", len(br), base_us + br_us))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    rows = measure("token", build_token_response(), args.repeat)
+    rows += measure("task", build_task_list(1).tasks[0], args.repeat)
+    for size in args.sizes:
+        rows += measure(f"task_list[{size}]", build_task_list(size), args.repeat)
+
+    print(f"{'payload':<16} {'format':<14} {'bytes':>9} {'encode_us':>11}")
+    for name, fmt, size, micros in rows:
+        print(f"{name:<16} {fmt:<14} {size:>9} {micros:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Per-query overhead of the hot task and login lookups
+
+Compares the per-call db.query(...) chains the services used to build
+("before") with the module-level statements they execute now ("after"):
+
+- build: constructing the statement and its compiled-cache key, no database
+- call: one execution on a fresh session, including ORM loading
+- plan (PostgreSQL only): server planning time per execution when the SQL is
+  sent as text, vs. executing a prepared statement (what psycopg 3 does once
+  DB_PREPARE_THRESHOLD is reached)
+
+Reads whatever DATABASE_URL holds; seed it first for realistic plans:
+
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.query_overhead --repeat 2000
+"""
+import argparse
+import json
+import logging
+import re
+import statistics
+import time
+from sqlalchemy import func
+from app.database import SessionLocal, engine
+from app.models import Task, User
+from app.services.auth_service import USER_BY_EMAIL
+from app.services.task_service import USER_TASKS_PAGE, TASK_BY_ID, USER_TASK_COUNT
+from app.sharding import shard_router
+
+PAGE_SIZE = 10
+
+
+def busiest_owner() -> tuple[int, int]:
+    """(user_id, task_id) for the user with the most tasks on any shard"""
+    best = None
+    for name in shard_router.shard_names:
+        row = shard_router.run_on_shard(name, lambda db: db.query(
+            Task.owner_id, func.count(Task.id), func.min(Task.id)
+        ).group_by(Task.owner_id).order_by(func.count(Task.id).desc()).first())
+        if row and (best is None or row[1] > best[1]):
+            best = row
+    if best is None:
+        raise SystemExit("No tasks found; seed the database first (python seed_data.py)")
+    return best[0], best[2]
+
+
+def queries(user_id: int, task_id: int, email: str) -> dict:
+    """name -> (session factory, old Query builder, new statement, parameters)"""
+    task_session = lambda: shard_router.session_for(user_id)
+    return {
+        "get_task": (
+            task_session,
+            lambda db: db.query(Task).filter((Task.id == task_id) & (Task.owner_id == user_id)),
+            TASK_BY_ID,
+            {"task_id": task_id, "user_id": user_id},
+        ),
+        "get_user_tasks": (
+            task_session,
+            lambda db: db.query(Task).filter(Task.owner_id == user_id).offset(0).limit(PAGE_SIZE),
+            USER_TASKS_PAGE,
+            {"user_id": user_id, "skip": 0, "limit": PAGE_SIZE},
+        ),
+        "get_task_count": (
+            task_session,
+            lambda db: db.query(Task).filter(Task.owner_id == user_id),
+            USER_TASK_COUNT,
+            {"user_id": user_id},
+        ),
+        "login_user lookup": (
+            SessionLocal,
+            lambda db: db.query(User).filter(User.email == email),
+            USER_BY_EMAIL,
+            {"email": email},
+        ),
+    }
+
+
+def run_before(name: str, query) -> None:
+    # Exactly what each service method did per call
+    if name == "get_task":
+        query.first()
+    elif name == "get_user_tasks":
+        query.all()
+    elif name == "get_task_count":
+        query.count()
+    else:
+        query.first().role.name
+
+
+def run_after(name: str, db, statement, params: dict) -> None:
+    if name == "get_task_count":
+        db.scalar(statement, params)
+    elif name == "login_user lookup":
+        db.scalars(statement, params).first().role.name
+    else:
+        db.scalars(statement, params).all()
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    timings = sorted(timings)
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def time_build(name, session_factory, build, statement, repeat: int) -> tuple:
+    db = session_factory()
+    try:
+        before, after = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(db)._statement_20()._generate_cache_key()
+            before.append((time.perf_counter() - start) * 1e6)
+
+            start = time.perf_counter()
+            statement._generate_cache_key()
+            after.append((time.perf_counter() - start) * 1e6)
+    finally:
+        db.close()
+    return percentiles(before), percentiles(after)
+
+
+def time_call(name, session_factory, build, statement, params, repeat: int) -> tuple:
+    before, after = [], []
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            start = time.perf_counter()
+            run_before(name, build(db))
+            before.append((time.perf_counter() - start) * 1e6)
+        finally:
+            db.close()
+
+        db = session_factory()
+        try:
+            start = time.perf_counter()
+            run_after(name, db, statement, params)
+            after.append((time.perf_counter() - start) * 1e6)
+        finally:
+            db.close()
+    return percentiles(before), percentiles(after)
+
+
+def time_planning(name, session_factory, statement, params, repeat: int) -> tuple:
+    """Planning Time reported by EXPLAIN ANALYZE for text SQL vs. EXECUTE of a prepared statement"""
+    db = session_factory()
+    try:
+        connection = db.connection()
+        dialect = connection.dialect
+        literal_sql = str(statement.params(**params).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        ))
+        compiled = statement.compile(dialect=dialect)
+        order = re.findall(r"%\((\w+)\)s", compiled.string)
+        prepared_sql = re.sub(r"%\((\w+)\)s", lambda m: f"${order.index(m.group(1)) + 1}", compiled.string)
+        arguments = ", ".join(f"'{params[key]}'" for key in order)
+
+        def planning_ms(sql: str) -> float:
+            plan = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}").scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return plan[0]["Planning Time"]
+
+        unprepared = [planning_ms(literal_sql) for _ in range(repeat)]
+        connection.exec_driver_sql(f"PREPARE bench_stmt AS {prepared_sql}")
+        try:
+            prepared = [planning_ms(f"EXECUTE bench_stmt({arguments})") for _ in range(repeat)]
+        finally:
+            connection.exec_driver_sql("DEALLOCATE bench_stmt")
+        db.rollback()
+    finally:
+        db.close()
+    return percentiles([ms * 1000 for ms in unprepared]), percentiles([ms * 1000 for ms in prepared])
+
+
+def render_row(name: str, before: tuple, after: tuple) -> str:
+    return (
+        f"| {name} | {before[0]:.1f} / {before[1]:.1f} | {after[0]:.1f} / {after[1]:.1f} "
+        f"| {before[0] / after[0]:.1f}x |"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--plan-repeat", type=int, default=50)
+    parser.add_argument("--output", help="Also write the markdown report to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("app").setLevel(logging.WARNING)
+    for shard_engine in shard_router.engines.values():
+        shard_engine.echo = False
+
+    user_id, task_id = busiest_owner()
+    db = SessionLocal()
+    try:
+        email = db.query(User.email).filter(User.id == user_id).scalar()
+    finally:
+        db.close()
+    cases = queries(user_id, task_id, email)
+
+    sections = {"build": [], "call": [], "plan": []}
+    for name, (session_factory, build, statement, params) in cases.items():
+        # Warm the compiled cache so both sides measure steady state
+        time_call(name, session_factory, build, statement, params, 5)
+        sections["build"].append(render_row(name, *time_build(name, session_factory, build, statement, args.repeat)))
+        sections["call"].append(render_row(name, *time_call(name, session_factory, build, statement, params, args.repeat)))
+        if engine.dialect.name == "postgresql":
+            sections["plan"].append(render_row(name, *time_planning(name, session_factory, statement, params, args.plan_repeat)))
+
+    titles = {
+        "build": ("Statement build + cache key (µs, p50 / p95)", "before", "after"),
+        "call": ("Full call on a fresh session (µs, p50 / p95)", "before", "after"),
+        "plan": ("PostgreSQL planning time per execution (µs, p50 / p95)", "text SQL", "prepared"),
+    }
+    lines = [f"# Hot query overhead (user {user_id})", ""]
+    for section, rows in sections.items():
+        if not rows:
+            lines += [f"_{titles[section][0]}: skipped, PostgreSQL only_", ""]
+            continue
+        title, before, after = titles[section]
+        lines += [f"## {title}", "", f"| query | {before} | {after} | speedup |", "|---|---|---|---|", *rows, ""]
+    report = "\n".join(lines)
+
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+        print(f"✓ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""How TaskService operations scale with the number of task rows
+
+Grows the tasks table in place through each size in --sizes (seeding with
+seed_data.py, skewed owners) and times every operation for the heaviest, the
+median and the lightest seeded user. Writes into DATABASE_URL, so point it at
+a scratch database:
+
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.task_scaling --sizes 1000 10000 100000
+"""
+import argparse
+import logging
+import random
+import statistics
+import time
+from sqlalchemy import func
+from app.models import Task
+from app.schemas import TaskCreate, TaskUpdate
+from app.services import TaskService
+from app.sharding import shard_router
+from init_db import init_db
+from seed_data import seed_users, seed_tasks, analyze
+
+PAGE_SIZE = 10
+DEEP_OFFSET = 1000
+BATCH_IDS = 20
+
+
+def count_tasks() -> int:
+    return sum(
+        shard_router.run_on_shard(name, lambda db: db.query(func.count(Task.id)).scalar())
+        for name in shard_router.shard_names
+    )
+
+
+def sample_task_ids(user_id: int, count: int, rng: random.Random) -> list[int]:
+    db = shard_router.session_for(user_id)
+    try:
+        ids = [row.id for row in db.query(Task.id).filter(Task.owner_id == user_id).limit(count * 10)]
+    finally:
+        db.close()
+    return rng.sample(ids, min(count, len(ids)))
+
+
+def operations(user_id: int, task_ids: list[int]) -> dict:
+    """Each operation takes a fresh session, as a request would"""
+    task_ids = task_ids or [0]
+    update = TaskUpdate(priority="high")
+    return {
+        "get_user_tasks": lambda db: TaskService.get_user_tasks(db, user_id, 0, PAGE_SIZE),
+        f"get_user_tasks(skip={DEEP_OFFSET})": lambda db: TaskService.get_user_tasks(db, user_id, DEEP_OFFSET, PAGE_SIZE),
+        "get_task_count": lambda db: TaskService.get_task_count(db, user_id),
+        "get_user_status_counts": lambda db: TaskService.get_user_status_counts(db, user_id),
+        "get_task": lambda db: TaskService.get_task(db, random.choice(task_ids), user_id),
+        f"get_tasks_by_ids[{BATCH_IDS}]": lambda db: TaskService.get_tasks_by_ids(db, user_id, task_ids[:BATCH_IDS]),
+        "update_task": lambda db: TaskService.update_task(db, random.choice(task_ids), update, user_id),
+        "create+delete_task": lambda db: TaskService.delete_task(
+            db, TaskService.create_task(db, TaskCreate(title="benchmark"), user_id).id, user_id
+        ),
+    }
+
+
+def time_operation(user_id: int, operation, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        db = shard_router.session_for(user_id)
+        try:
+            start = time.perf_counter()
+            operation(db)
+            timings.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            # e.g. 404 for a user with no tasks yet
+            timings.append(float("nan"))
+        finally:
+            db.close()
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def render_report(results: dict, holdings: dict, sizes: list[int]) -> str:
+    header = "| operation | user | " + " | ".join(f"{size:,} rows" for size in sizes) + " |"
+    lines = [
+        "# TaskService scaling (p50 / p95 ms)",
+        "",
+        header,
+        "|" + "---|" * (len(sizes) + 2),
+    ]
+    for user, by_size in holdings.items():
+        cells = [f"{by_size[size]:,}" if size in by_size else "–" for size in sizes]
+        lines.append(f"| tasks held | {user} | " + " | ".join(cells) + " |")
+    for (operation, user), by_size in results.items():
+        cells = [
+            f"{by_size[size][0]:.2f} / {by_size[size][1]:.2f}" if size in by_size else "–"
+            for size in sizes
+        ]
+        lines.append(f"| {operation} | {user} | " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the markdown report to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("app").setLevel(logging.WARNING)
+    for shard_engine in shard_router.engines.values():
+        shard_engine.echo = False
+
+    rng = random.Random(args.seed)
+    init_db()
+    user_ids = seed_users(args.users, rng)
+    # seed_tasks treats the list as heaviest first
+    profiles = {"heavy": user_ids[0], "median": user_ids[len(user_ids) // 2], "light": user_ids[-1]}
+
+    results = {}
+    holdings = {}
+    sizes = sorted(args.sizes)
+    for size in sizes:
+        current = count_tasks()
+        if current > size:
+            print(f"skipping {size:,} rows (table already has {current:,})")
+            continue
+        if size > current:
+            print(f"seeding {size - current:,} tasks...")
+            seed_tasks(user_ids, size - current, args.skew, args.batch_size, rng, progress=True)
+            analyze()
+
+        for label, user_id in profiles.items():
+            holdings.setdefault(label, {})[size] = shard_router.run_on_shard(
+                shard_router.shard_for(user_id), lambda db: TaskService.get_task_count(db, user_id)
+            )
+            task_ids = sample_task_ids(user_id, BATCH_IDS, rng)
+            for name, operation in operations(user_id, task_ids).items():
+                results.setdefault((name, label), {})[size] = time_operation(user_id, operation, args.repeat)
+        print(f"measured {size:,} rows")
+
+    report = render_report(results, holdings, sizes)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+        print(f"✓ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
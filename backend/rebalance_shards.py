@@ -0,0 +1,75 @@
+"""Task shard rebalancing utility"""
+import argparse
+from sqlalchemy import func
+from app.database import SessionLocal
+from app.models import Task, TaskShardAssignment
+from app.sharding import shard_router, move_user_tasks
+
+
+def misplaced_users() -> list[tuple[int, str, str]]:
+    """Users whose pinned shard differs from their hash ring placement"""
+    db = SessionLocal()
+    try:
+        assignments = db.query(TaskShardAssignment.user_id, TaskShardAssignment.shard).all()
+    finally:
+        db.close()
+
+    return [
+        (row.user_id, row.shard, shard_router.ring.get_node(row.user_id))
+        for row in assignments
+        if row.shard != shard_router.ring.get_node(row.user_id)
+    ]
+
+
+def show_status():
+    db = SessionLocal()
+    try:
+        users_per_shard = dict(
+            db.query(TaskShardAssignment.shard, func.count(TaskShardAssignment.user_id))
+            .group_by(TaskShardAssignment.shard)
+            .all()
+        )
+    finally:
+        db.close()
+
+    for name in shard_router.shard_names:
+        tasks = shard_router.run_on_shard(name, lambda db: db.query(func.count(Task.id)).scalar())
+        print(f"{name:<20} users={users_per_shard.get(name, 0):<8} tasks={tasks}")
+
+    print(f"\n{len(misplaced_users())} user(s) pinned away from their ring placement")
+
+
+def rebalance(limit: int, batch_size: int, settle_seconds: float):
+    for user_id, source, target in misplaced_users()[:limit]:
+        copied = move_user_tasks(user_id, target, batch_size, settle_seconds)
+        print(f"✓ Moved user {user_id}: {source} → {target} ({copied} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--settle-seconds", type=float, default=None,
+        help="Wait for workers to see each placement change (defaults to SHARD_MAP_REFRESH_SECONDS)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="Show users and tasks per shard")
+
+    move_parser = commands.add_parser("move", help="Move one user's tasks to a shard")
+    move_parser.add_argument("user_id", type=int)
+    move_parser.add_argument("shard")
+
+    rebalance_parser = commands.add_parser("rebalance", help="Move users to their ring placement")
+    rebalance_parser.add_argument("--limit", type=int, default=100)
+
+    args = parser.parse_args()
+    shard_router.create_schema()
+
+    if args.command == "status":
+        show_status()
+    elif args.command == "move":
+        copied = move_user_tasks(args.user_id, args.shard, args.batch_size, args.settle_seconds)
+        print(f"✓ Moved user {args.user_id} to {args.shard} ({copied} rows)")
+    else:
+        rebalance(args.limit, args.batch_size, args.settle_seconds)
@@ -0,0 +1,219 @@
+"""Scale-test data seeding utility
+
+Creates users and tasks in bulk on top of init_db.py. Task owners follow a Zipf
+distribution, so with the defaults a handful of users hold 100k+ tasks while
+most hold a few. Rows go in through COPY on PostgreSQL and executemany on
+SQLite, in batches of --batch-size.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Role, User, Task
+from app.sharding import shard_router, TaskIdAllocator
+from app.utils import hash_password
+from init_db import init_db
+
+SEED_PASSWORD = "seed-password"
+
+TASK_COLUMNS = [
+    "title", "description", "status", "priority", "owner_id",
+    "is_completed", "created_at", "updated_at", "version"
+]
+
+VERBS = ["Review", "Write", "Fix", "Update", "Plan", "Test", "Deploy", "Refactor", "Document", "Call"]
+NOUNS = ["report", "invoice", "release", "login page", "API docs", "budget", "roadmap", "backup", "sprint", "client"]
+DESCRIPTIONS = [
+    "Follow up with the team before the end of the week",
+    "Blocked on feedback from design",
+    "Check the numbers against last quarter and send a summary",
+    "Low effort, can be picked up by anyone",
+    None,
+    None,
+]
+# Weighted pools: rng.choice on these is much cheaper than rng.choices per row
+STATUS_POOL = ["pending"] * 7 + ["in_progress"] * 3 + ["completed"] * 10
+PRIORITY_POOL = ["low"] * 3 + ["medium"] * 5 + ["high"] * 2
+HISTORY_DAYS = 730
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat(" ", "microseconds")
+
+
+def zipf_cum_weights(count: int, skew: float) -> list[float]:
+    """Cumulative weights for ranks 1..count with P(rank) ∝ rank^-skew"""
+    total = 0.0
+    cum_weights = []
+    for rank in range(1, count + 1):
+        total += rank ** -skew
+        cum_weights.append(total)
+    return cum_weights
+
+
+def bulk_insert(target: Engine, table_name: str, columns: list[str], rows: list[tuple]):
+    """Insert pre-rendered rows with the fastest path the driver offers"""
+    raw = target.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if target.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            copy_sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+            if target.dialect.driver == "psycopg":
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                cursor.copy_expert(copy_sql, buffer)
+        else:
+            placeholder = "?" if target.dialect.paramstyle == "qmark" else "%s"
+            cursor.executemany(
+                f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join([placeholder] * len(columns))})",
+                rows
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def seed_users(count: int, rng: random.Random) -> list[int]:
+    """Create `count` users sharing one password; returns their ids, shuffled"""
+    db = SessionLocal()
+    try:
+        role_id = db.query(Role.id).filter(Role.name == "user").scalar()
+        # Only numbers the emails; ids come from the database so the
+        # PostgreSQL users.id sequence stays ahead of them
+        start = (db.query(func.max(User.id)).scalar() or 0) + 1
+        hashed = hash_password(SEED_PASSWORD)
+        now = datetime.utcnow()
+
+        rows = []
+        for number in range(start, start + count):
+            joined = now - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+            rows.append({
+                "email": f"seed{number}@example.com",
+                "username": f"seed{number}",
+                "full_name": f"Seed User {number}",
+                "hashed_password": hashed,
+                "is_active": True,
+                "role_id": role_id,
+                "created_at": joined,
+                "updated_at": joined,
+            })
+        user_ids = list(db.scalars(insert(User).returning(User.id), rows))
+        db.commit()
+    finally:
+        db.close()
+
+    rng.shuffle(user_ids)
+    return user_ids
+
+
+def _task_row(owner_id: int, now: datetime, rng: random.Random) -> tuple:
+    created = now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+    updated = created + (now - created) * rng.random() ** 3
+    status = rng.choice(STATUS_POOL)
+    return (
+        f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{rng.randrange(1, 10000)}",
+        rng.choice(DESCRIPTIONS),
+        status,
+        rng.choice(PRIORITY_POOL),
+        owner_id,
+        1 if status == "completed" else 0,
+        _timestamp(created),
+        _timestamp(updated),
+        1,
+    )
+
+
+def seed_tasks(
+    user_ids: list[int],
+    count: int,
+    skew: float,
+    batch_size: int,
+    rng: random.Random,
+    progress: bool = False
+) -> Counter:
+    """
+    Create `count` tasks owned by `user_ids` (heaviest first) with Zipf skew,
+    routed to each owner's shard. Returns tasks created per user.
+    """
+    cum_weights = zipf_cum_weights(len(user_ids), skew)
+    shard_of = {user_id: shard_router.placement_for_write(user_id)[0] for user_id in user_ids}
+    # Sharded tasks need globally unique ids; a single DB autoincrements
+    allocator = TaskIdAllocator(max(batch_size, settings.TASK_ID_BLOCK_SIZE)) if shard_router.sharded else None
+    columns = (["id"] if allocator else []) + TASK_COLUMNS
+    per_user = Counter()
+    now = datetime.utcnow()
+    started = time.perf_counter()
+
+    for offset in range(0, count, batch_size):
+        owners = rng.choices(user_ids, cum_weights=cum_weights, k=min(batch_size, count - offset))
+        per_user.update(owners)
+
+        rows_by_shard: dict[str, list[tuple]] = {}
+        for owner_id in owners:
+            row = _task_row(owner_id, now, rng)
+            if allocator:
+                row = (allocator.next_id(shard_router),) + row
+            rows_by_shard.setdefault(shard_of[owner_id], []).append(row)
+
+        for shard, rows in rows_by_shard.items():
+            bulk_insert(shard_router.engines[shard], Task.__tablename__, columns, rows)
+
+        if progress:
+            done = offset + len(owners)
+            print(f"  {done:>12,} tasks  ({done / (time.perf_counter() - started):,.0f} rows/s)", end="\r")
+
+    if progress:
+        print()
+    return per_user
+
+
+def analyze():
+    """Refresh planner statistics so query plans match the new data volume"""
+    for shard_engine in {id(e): e for e in shard_router.engines.values()}.values():
+        with shard_engine.begin() as conn:
+            conn.exec_driver_sql(f"ANALYZE {Task.__tablename__}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent; 0 spreads tasks evenly")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    init_db()
+
+    start = time.perf_counter()
+    user_ids = seed_users(args.users, rng)
+    print(f"✓ Created {len(user_ids):,} users (password: {SEED_PASSWORD!r})")
+
+    per_user = seed_tasks(user_ids, args.tasks, args.skew, args.batch_size, rng, progress=True)
+    analyze()
+    elapsed = time.perf_counter() - start
+    print(f"✓ Created {args.tasks:,} tasks in {elapsed:.1f}s ({args.tasks / elapsed:,.0f} rows/s)")
+
+    print("\nHeaviest users:")
+    heaviest = per_user.most_common(5)
+    db = SessionLocal()
+    try:
+        emails = dict(db.query(User.id, User.email).filter(User.id.in_([user_id for user_id, _ in heaviest])))
+    finally:
+        db.close()
+    for user_id, tasks in heaviest:
+        print(f"  {emails[user_id]}  {tasks:,} tasks")
+    print(f"  median user   {sorted(per_user[u] for u in user_ids)[len(user_ids) // 2]:,} tasks")
@@ -0,0 +1,77 @@
+"""Production server launcher
+
+Bootstraps the database once in this process, then starts a pool of uvicorn
+workers that skip the bootstrap and each size their SQLAlchemy pool to a share
+of the global connection budget. Workers are recycled after a (jittered)
+number of requests and drain in-flight requests on SIGTERM.
+"""
+import argparse
+import os
+from app.config import settings
+
+
+def worker_pool_size(budget: int, workers: int, background_reserve: int = 2) -> tuple[int, int]:
+    """
+    Split a connection budget across workers as (pool_size, max_overflow).
+    A few connections stay reserved for the parent's background jobs; a
+    quarter of each worker's share is overflow so idle pools stay small.
+    """
+    per_worker = max(1, (budget - background_reserve) // workers)
+    max_overflow = per_worker // 4
+    return max(1, per_worker - max_overflow), max_overflow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS)
+    parser.add_argument(
+        "--connection-budget", type=int, default=settings.DB_CONNECTION_BUDGET,
+        help="Maximum DB connections across all workers (per database)"
+    )
+    parser.add_argument("--max-requests", type=int, default=settings.WORKER_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.WORKER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.GRACEFUL_SHUTDOWN_SECONDS)
+    args = parser.parse_args()
+
+    pool_size, max_overflow = worker_pool_size(args.connection_budget, args.workers)
+
+    # Workers are spawned fresh and read these at import time
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    os.environ["SKIP_DB_BOOTSTRAP"] = "True"
+    os.environ["RUN_BACKGROUND_JOBS"] = "False"
+    # This process has already read its config; its engine (created on the
+    # import below) uses the same pool sizing
+    settings.DB_POOL_SIZE = pool_size
+    settings.DB_MAX_OVERFLOW = max_overflow
+
+    import uvicorn
+    from app.bootstrap import bootstrap, start_background_jobs, stop_background_jobs
+
+    print(f"Bootstrapping database before starting {args.workers} workers...")
+    bootstrap()
+    print(
+        f"✓ Per-worker pool: pool_size={pool_size}, max_overflow={max_overflow} "
+        f"(budget {args.connection_budget})"
+    )
+
+    start_background_jobs()
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            limit_max_requests=args.max_requests or None,
+            limit_max_requests_jitter=args.max_requests_jitter,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            log_level=settings.LOG_LEVEL.lower(),
+        )
+    finally:
+        stop_background_jobs()
+
+
+if __name__ == "__main__":
+    main()
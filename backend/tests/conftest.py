@@ -0,0 +1,61 @@
+"""Test setup: a temporary SQLite primary database plus two more SQLite shards
+
+The environment has to be in place before anything under app/ is imported,
+since app.config reads it at import time.
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+DATA_DIR = tempfile.mkdtemp(prefix="task-api-tests-")
+PRIMARY_URL = f"sqlite:///{DATA_DIR}/primary.db"
+
+os.environ.update({
+    "DATABASE_URL": PRIMARY_URL,
+    "TASK_SHARDS": f"s0={PRIMARY_URL},s1=sqlite:///{DATA_DIR}/s1.db,s2=sqlite:///{DATA_DIR}/s2.db",
+    "SHARD_MAP_REFRESH_SECONDS": "0",
+    "SKIP_DB_BOOTSTRAP": "True",
+    "RUN_BACKGROUND_JOBS": "False",
+    "CONCURRENCY_LIMIT_ENABLED": "False",
+    "ACTIVITY_FLUSH_INTERVAL": "0.05",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.bootstrap import seed_default_roles
+from app.database import Base, engine
+from app.main import app
+from app.sharding import shard_router
+
+for shard_engine in shard_router.engines.values():
+    shard_engine.echo = False
+Base.metadata.create_all(bind=engine)
+shard_router.create_schema()
+seed_default_roles()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register and log in a fresh user; returns (user_id, auth headers)"""
+    def make():
+        name = uuid.uuid4().hex[:12]
+        email = f"{name}@example.com"
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "username": name, "password": "password123"}
+        )
+        assert response.status_code == 201, response.text
+        user_id = response.json()["id"]
+
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+        assert response.status_code == 200, response.text
+        return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return make
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.database import SessionLocal
+from app.models import AccountDeletion, User
+from app.services import account_service
+from app.services.account_service import AccountService
+
+
+def deletion_row(user_id: int) -> AccountDeletion:
+    db = SessionLocal()
+    try:
+        return db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).first()
+    finally:
+        db.close()
+
+
+def test_failed_purge_is_retried_after_backoff(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    assert client.post("/api/v1/tasks", json={"title": "doomed"}, headers=headers).status_code == 201
+    assert client.delete("/api/v1/auth/me", headers=headers).status_code == 202
+
+    def fail(_seconds):
+        raise RuntimeError("shard unavailable")
+
+    monkeypatch.setattr(account_service, "time", SimpleNamespace(sleep=fail))
+    AccountService.run_pending_purges()
+    failed = deletion_row(user_id)
+    assert (failed.status, failed.attempts) == ("failed", 1)
+    assert failed.next_attempt_at > datetime.utcnow()
+
+    # Not due yet: the next poll leaves it alone
+    monkeypatch.undo()
+    AccountService.run_pending_purges()
+    assert deletion_row(user_id).status == "failed"
+
+    db = SessionLocal()
+    try:
+        db.query(AccountDeletion).filter(AccountDeletion.user_id == user_id).update(
+            {AccountDeletion.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    AccountService.run_pending_purges()
+    assert deletion_row(user_id).status == "completed"
+    assert client.get("/api/v1/auth/me/deletion", headers=headers).json()["tasks_deleted"] == 1
+    db = SessionLocal()
+    try:
+        assert db.query(User).filter(User.id == user_id).first() is None
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.models import Task, ArchivedTask
+from app.services import ArchiveService
+from app.sharding import shard_router
+
+LONG_AGO = datetime.utcnow() - timedelta(days=365)
+
+
+def create_task(client, headers, **changes) -> int:
+    response = client.post("/api/v1/tasks", json={"title": "archive me"}, headers=headers)
+    assert response.status_code == 201, response.text
+    task_id = response.json()["id"]
+    if changes:
+        response = client.put(f"/api/v1/tasks/{task_id}", json=changes, headers=headers)
+        assert response.status_code == 200, response.text
+    return task_id
+
+
+def age(shard: str, task_ids: list[int]):
+    def update(db):
+        db.query(Task).filter(Task.id.in_(task_ids)).update(
+            {Task.updated_at: LONG_AGO}, synchronize_session=False
+        )
+        db.commit()
+    shard_router.run_on_shard(shard, update)
+
+
+def ids_in(shard: str, model, user_id: int) -> set[int]:
+    return set(shard_router.run_on_shard(shard, lambda db: [
+        row.id for row in db.query(model.id).filter(model.owner_id == user_id)
+    ]))
+
+
+def test_archives_only_old_completed_tasks(client, make_user):
+    user_id, headers = make_user()
+    shard = shard_router.shard_for(user_id)
+    done = create_task(client, headers, is_completed=True)
+    open_task = create_task(client, headers)
+    recent = create_task(client, headers, status="completed")
+    age(shard, [done, open_task])
+
+    moved = shard_router.run_on_shard(
+        shard, lambda db: ArchiveService.archive_completed(db, datetime.utcnow() - timedelta(days=30))
+    )
+
+    assert moved >= 1
+    assert ids_in(shard, ArchivedTask, user_id) == {done}
+    assert ids_in(shard, Task, user_id) == {open_task, recent}
+
+
+def test_task_reopened_after_selection_is_not_archived(client, make_user):
+    user_id, headers = make_user()
+    shard = shard_router.shard_for(user_id)
+    reopened, done = create_task(client, headers, is_completed=True), create_task(client, headers, is_completed=True)
+    age(shard, [reopened, done])
+
+    def reopen_after_select(db):
+        scalars = db.scalars
+
+        def select_then_reopen(*args, **kwargs):
+            task_ids = scalars(*args, **kwargs).all()
+            # Another request reopens the task between the candidate select and the move
+            with shard_router.engines[shard].begin() as conn:
+                conn.execute(Task.__table__.update().where(Task.id == reopened).values(
+                    is_completed=False, status="pending", updated_at=datetime.utcnow()
+                ))
+            return SimpleNamespace(all=lambda: task_ids)
+
+        db.scalars = select_then_reopen
+        return ArchiveService.archive_completed(db, datetime.utcnow() - timedelta(days=30), max_batches=1)
+
+    shard_router.run_on_shard(shard, reopen_after_select)
+
+    assert done in ids_in(shard, ArchivedTask, user_id)
+    assert reopened not in ids_in(shard, ArchivedTask, user_id)
+    assert reopened in ids_in(shard, Task, user_id)
+
+
+def test_stale_if_match_leaves_archived_task_archived(client, make_user):
+    user_id, headers = make_user()
+    shard = shard_router.shard_for(user_id)
+    task_id = create_task(client, headers, is_completed=True)
+    age(shard, [task_id])
+    shard_router.run_on_shard(
+        shard, lambda db: ArchiveService.archive_completed(db, datetime.utcnow() - timedelta(days=30))
+    )
+    assert task_id in ids_in(shard, ArchivedTask, user_id)
+
+    url = f"/api/v1/tasks/{task_id}"
+    response = client.put(url, json={"title": "stale"}, headers={**headers, "If-Match": '"1"'})
+    assert response.status_code == 412
+    assert task_id in ids_in(shard, ArchivedTask, user_id)
+    assert task_id not in ids_in(shard, Task, user_id)
+
+    response = client.put(url, json={"title": "current"}, headers={**headers, "If-Match": '"2"'})
+    assert response.status_code == 200
+    assert response.json()["version"] == 3
+    assert task_id in ids_in(shard, Task, user_id)
+    assert task_id not in ids_in(shard, ArchivedTask, user_id)
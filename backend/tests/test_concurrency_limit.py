@@ -0,0 +1,68 @@
+import time
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.config import settings
+from app.middleware.concurrency_limit_middleware import ConcurrencyLimitMiddleware
+
+
+def limited_app(monkeypatch, untimed: list[str]) -> tuple[TestClient, ConcurrencyLimitMiddleware]:
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "CONCURRENCY_LATENCY_TARGET_MS", 50)
+    monkeypatch.setattr(settings, "CONCURRENCY_UNTIMED_ROUTES", untimed)
+
+    async def with_background(request):
+        return JSONResponse({}, background=BackgroundTask(time.sleep, 0.2))
+
+    async def slow(request):
+        time.sleep(0.2)
+        return JSONResponse({})
+
+    middleware = ConcurrencyLimitMiddleware(Starlette(routes=[
+        Route("/background", with_background), Route("/slow", slow, methods=["POST"])
+    ]))
+    return TestClient(middleware), middleware
+
+
+def test_background_work_does_not_count_as_latency(monkeypatch):
+    client, middleware = limited_app(monkeypatch, [])
+    limit = middleware.limiter.limit
+
+    assert client.get("/background").status_code == 200
+    assert middleware.limiter.limit >= limit
+    assert middleware.limiter.latency_ewma < 0.2
+    assert middleware.limiter.in_flight == 0
+
+
+def test_untimed_routes_leave_the_limit_alone(monkeypatch):
+    client, middleware = limited_app(monkeypatch, ["POST /slow"])
+    limit = middleware.limiter.limit
+
+    assert client.post("/slow").status_code == 200
+    assert middleware.limiter.limit == limit
+    assert middleware.limiter.latency_ewma == 0
+    assert middleware.limiter.in_flight == 0
+
+
+def test_slow_responses_cut_the_limit(monkeypatch):
+    client, middleware = limited_app(monkeypatch, [])
+    limit = middleware.limiter.limit
+
+    assert client.post("/slow").status_code == 200
+    assert middleware.limiter.limit < limit
+
+
+def test_shed_responses_carry_cors_headers(client, monkeypatch):
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_ENABLED", True)
+    layer = client.app.middleware_stack
+    while not isinstance(layer, ConcurrencyLimitMiddleware):
+        layer = layer.app
+    monkeypatch.setattr(layer.limiter, "limit", 1.0)
+    monkeypatch.setattr(layer.limiter, "in_flight", 5)
+
+    origin = settings.CORS_ORIGINS[0]
+    response = client.get("/api/v1/tasks", headers={"Origin": origin})
+    assert response.status_code == 503
+    assert response.headers["Access-Control-Allow-Origin"] == origin
@@ -0,0 +1,36 @@
+import uuid
+import msgpack
+
+MSGPACK = "application/msgpack"
+
+
+def test_retry_replays_the_first_response(client, make_user):
+    _, headers = make_user()
+    keyed = {**headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/api/v1/tasks", json={"title": "once"}, headers=keyed)
+    retry = client.post("/api/v1/tasks", json={"title": "once"}, headers=keyed)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert client.get("/api/v1/tasks", headers=headers).json()["total"] == 1
+
+
+def test_key_reused_with_another_format_is_refused(client, make_user):
+    _, headers = make_user()
+    keyed = {**headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/api/v1/tasks", json={"title": "packed"}, headers={**keyed, "Accept": MSGPACK})
+    assert first.status_code == 201
+    assert first.headers["Content-Type"] == MSGPACK
+    assert msgpack.unpackb(first.content, timestamp=3)["title"] == "packed"
+
+    retry = client.post("/api/v1/tasks", json={"title": "packed"}, headers={**keyed, "Accept": "application/json"})
+    assert retry.status_code == 422
+    assert retry.headers["Content-Type"] == "application/json"
+
+    replay = client.post("/api/v1/tasks", json={"title": "packed"}, headers={**keyed, "Accept": MSGPACK})
+    assert replay.status_code == 201
+    assert replay.content == first.content
+    assert client.get("/api/v1/tasks", headers=headers).json()["total"] == 1
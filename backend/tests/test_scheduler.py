@@ -0,0 +1,37 @@
+import threading
+from app.utils.scheduler import PeriodicJob
+
+
+def test_failing_run_does_not_end_the_job():
+    runs = []
+    done = threading.Event()
+
+    def job():
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise RuntimeError("primary database unavailable")
+        done.set()
+
+    scheduler = PeriodicJob("test-job", 0.01, job)
+    scheduler.start()
+    try:
+        assert done.wait(2)
+        assert scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+        scheduler._thread.join(1)
+    assert not scheduler._thread.is_alive()
+    assert len(runs) >= 2
+
+
+def test_waits_an_interval_before_the_first_run_unless_told_otherwise():
+    ran = threading.Event()
+    delayed = PeriodicJob("delayed", 60, ran.set)
+    delayed.start()
+    assert not ran.wait(0.1)
+    delayed.stop()
+
+    immediate = PeriodicJob("immediate", 60, ran.set, run_immediately=True)
+    immediate.start()
+    assert ran.wait(2)
+    immediate.stop()
@@ -0,0 +1,237 @@
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import func
+from app import sharding
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Task, TaskActivity, TaskShardAssignment
+from app.services import TaskService
+from app.sharding import shard_router, move_user_tasks
+
+
+def create_tasks(client, headers, count: int) -> list[dict]:
+    tasks = []
+    for i in range(count):
+        response = client.post("/api/v1/tasks", json={"title": f"task {i}"}, headers=headers)
+        assert response.status_code == 201, response.text
+        tasks.append(response.json())
+    return tasks
+
+
+def task_ids_on(shard: str, user_id: int) -> set[int]:
+    return set(shard_router.run_on_shard(shard, lambda db: [
+        row.id for row in db.query(Task.id).filter(Task.owner_id == user_id)
+    ]))
+
+
+def activity_rows(shard: str) -> set[tuple]:
+    return set(shard_router.run_on_shard(shard, lambda db: [
+        (row.id, row.owner_id, row.task_id, row.action)
+        for row in db.query(TaskActivity.id, TaskActivity.owner_id, TaskActivity.task_id, TaskActivity.action)
+    ]))
+
+
+def wait_for_history(client, headers, task_id: int, events: int) -> list[dict]:
+    deadline = time.monotonic() + 5
+    while True:
+        history = client.get(f"/api/v1/tasks/{task_id}/history", headers=headers).json()
+        if history["total"] >= events or time.monotonic() > deadline:
+            return history["events"]
+        time.sleep(0.05)
+
+
+def assignment_row(user_id: int):
+    db = SessionLocal()
+    try:
+        return db.query(TaskShardAssignment).filter(TaskShardAssignment.user_id == user_id).first()
+    finally:
+        db.close()
+
+
+def set_placement(user_id: int, shard: str, moving: bool):
+    """Change the placement behind this worker's back, as another process would"""
+    db = SessionLocal()
+    try:
+        db.query(TaskShardAssignment).filter(TaskShardAssignment.user_id == user_id).update(
+            {TaskShardAssignment.shard: shard, TaskShardAssignment.moving: moving}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def other_shard(user_id: int) -> str:
+    source = shard_router.shard_for(user_id)
+    return next(name for name in shard_router.shard_names if name != source)
+
+
+def test_routing_is_sticky_and_spread(make_user):
+    users = [make_user()[0] for _ in range(12)]
+    placement = {user_id: shard_router.shard_for(user_id) for user_id in users}
+
+    # A worker with an empty cache reads the same placement back from the primary DB
+    shard_router._assignments.clear()
+    assert {user_id: shard_router.shard_for(user_id) for user_id in users} == placement
+    assert len(set(placement.values())) > 1
+
+
+def test_crud_lands_on_owner_shard(client, make_user):
+    user_id, headers = make_user()
+    shard = shard_router.shard_for(user_id)
+    task = create_tasks(client, headers, 1)[0]
+
+    assert task_ids_on(shard, user_id) == {task["id"]}
+    for name in shard_router.shard_names:
+        if name != shard:
+            assert task_ids_on(name, user_id) == set()
+
+    response = client.put(f"/api/v1/tasks/{task['id']}", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f"/api/v1/tasks/{task['id']}", headers=headers).json()["status"] == "in_progress"
+    assert client.get("/api/v1/tasks", headers=headers).json()["total"] == 1
+
+    assert client.delete(f"/api/v1/tasks/{task['id']}", headers=headers).status_code == 204
+    assert task_ids_on(shard, user_id) == set()
+
+
+def test_task_ids_unique_across_shards(client, make_user):
+    ids = []
+    for _ in range(6):
+        _, headers = make_user()
+        ids += [task["id"] for task in create_tasks(client, headers, 3)]
+    assert len(ids) == len(set(ids))
+
+
+def test_fan_out_and_global_stats(client, make_user):
+    _, headers = make_user()
+    create_tasks(client, headers, 2)
+
+    per_shard = asyncio.run(shard_router.fan_out(
+        lambda db: db.query(func.count(Task.id)).scalar()
+    ))
+    assert set(per_shard) == set(shard_router.shard_names)
+
+    stats = asyncio.run(TaskService.get_global_stats())
+    assert stats.by_shard == per_shard
+    assert stats.total == sum(per_shard.values())
+
+
+def test_move_user_tasks_moves_only_that_user(client, make_user):
+    user_id, headers = make_user()
+    neighbour_id, neighbour_headers = make_user()
+    ids = {task["id"] for task in create_tasks(client, headers, 5)}
+    create_tasks(client, neighbour_headers, 3)
+    neighbour_tasks = {
+        name: task_ids_on(name, neighbour_id) for name in shard_router.shard_names
+    }
+
+    source, target = shard_router.shard_for(user_id), other_shard(user_id)
+    assert move_user_tasks(user_id, target, batch_size=2, settle_seconds=0) >= 5
+
+    assert shard_router.shard_for(user_id) == target
+    assert task_ids_on(target, user_id) == ids
+    assert task_ids_on(source, user_id) == set()
+    assert {name: task_ids_on(name, neighbour_id) for name in shard_router.shard_names} == neighbour_tasks
+    assert client.get("/api/v1/tasks", headers=headers).json()["total"] == 5
+
+
+def test_writes_refused_while_moving(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    task = create_tasks(client, headers, 1)[0]
+    responses = []
+
+    def settle(_seconds):
+        if len(responses) == 0:
+            responses.append(client.post("/api/v1/tasks", json={"title": "late"}, headers=headers))
+            responses.append(client.put(f"/api/v1/tasks/{task['id']}", json={"title": "x"}, headers=headers))
+            responses.append(client.get(f"/api/v1/tasks/{task['id']}", headers=headers))
+
+    monkeypatch.setattr(sharding, "time", SimpleNamespace(sleep=settle))
+    move_user_tasks(user_id, other_shard(user_id))
+
+    created, updated, read = responses
+    assert created.status_code == 503 and created.headers["Retry-After"]
+    assert updated.status_code == 503
+    assert read.status_code == 200
+    assert client.get("/api/v1/tasks", headers=headers).json()["total"] == 1
+    assert client.post("/api/v1/tasks", json={"title": "after"}, headers=headers).status_code == 201
+
+
+def test_writes_after_flip_survive_the_move(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    kept, removed = create_tasks(client, headers, 2)
+    target = other_shard(user_id)
+    settles = []
+
+    def settle(_seconds):
+        settles.append(_seconds)
+        if len(settles) == 2:
+            # Placement already points at the target; the source rows still exist
+            assert shard_router.shard_for(user_id) == target
+            response = client.put(f"/api/v1/tasks/{kept['id']}", json={"title": "edited"}, headers=headers)
+            assert response.status_code == 200
+            assert client.delete(f"/api/v1/tasks/{removed['id']}", headers=headers).status_code == 204
+
+    monkeypatch.setattr(sharding, "time", SimpleNamespace(sleep=settle))
+    move_user_tasks(user_id, target)
+
+    assert len(settles) == 2
+    listed = client.get("/api/v1/tasks", headers=headers).json()
+    assert [task["id"] for task in listed["tasks"]] == [kept["id"]]
+    assert listed["tasks"][0]["title"] == "edited"
+    assert listed["tasks"][0]["version"] == kept["version"] + 1
+
+
+def test_move_keeps_history_and_other_users_activity(client, make_user):
+    user_id, headers = make_user()
+    task = create_tasks(client, headers, 1)[0]
+    for title in ("one", "two"):
+        client.put(f"/api/v1/tasks/{task['id']}", json={"title": title}, headers=headers)
+    history = wait_for_history(client, headers, task["id"], 3)
+    assert len(history) == 3
+
+    source, target = shard_router.shard_for(user_id), other_shard(user_id)
+    # Activity ids are per shard: give another user rows on the target with the same ids
+    taken = {row[0] for row in activity_rows(target)}
+    with shard_router.engines[target].begin() as conn:
+        for event in history:
+            conn.execute(TaskActivity.__table__.insert().values(
+                id=None if event["id"] in taken else event["id"],
+                task_id=0, owner_id=-1, actor_id=-1, action="created", created_at=datetime.utcnow()
+            ))
+    others = activity_rows(target)
+
+    move_user_tasks(user_id, target, settle_seconds=0)
+
+    assert {row for row in activity_rows(target) if row[1] != user_id} == others
+    moved = wait_for_history(client, headers, task["id"], 3)
+    assert [(e["action"], e["changes"]) for e in moved] == [(e["action"], e["changes"]) for e in history]
+    assert not [row for row in activity_rows(source) if row[1] == user_id]
+
+
+def test_writes_use_the_primary_placement_not_a_stale_cache(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    create_tasks(client, headers, 1)
+    source, target = shard_router.shard_for(user_id), other_shard(user_id)
+    # Another process changes the placement; this worker's map is not due for a refresh
+    monkeypatch.setattr(settings, "SHARD_MAP_REFRESH_SECONDS", 3600)
+    set_placement(user_id, source, moving=True)
+
+    assert shard_router.shard_for(user_id) == source
+    assert client.post("/api/v1/tasks", json={"title": "late"}, headers=headers).status_code == 503
+
+    set_placement(user_id, target, moving=False)
+    created = client.post("/api/v1/tasks", json={"title": "moved"}, headers=headers)
+    assert created.status_code == 201
+    assert created.json()["id"] in task_ids_on(target, user_id)
+
+
+def test_reads_do_not_recreate_a_forgotten_assignment(make_user):
+    user_id, _ = make_user()
+    shard_router.placement_for_write(user_id)
+    shard_router.forget(user_id)
+
+    assert shard_router.shard_for(user_id) in shard_router.shard_names
+    assert assignment_row(user_id) is None
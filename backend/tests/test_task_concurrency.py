@@ -0,0 +1,81 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from app.schemas import TaskUpdate
+from app.services import TaskService
+from app.sharding import shard_router
+
+CLIENTS = 8
+REQUESTS_PER_CLIENT = 15
+
+
+def test_concurrent_puts_on_one_task(client, make_user):
+    _, headers = make_user()
+    response = client.post("/api/v1/tasks", json={"title": "contended"}, headers=headers)
+    assert response.status_code == 201
+    url = f"/api/v1/tasks/{response.json()['id']}"
+
+    def hammer(worker: int) -> list[tuple]:
+        rng = random.Random(worker)
+        outcomes = []
+        for i in range(REQUESTS_PER_CLIENT):
+            body = {"title": f"worker {worker} write {i}"}
+            if rng.random() < 0.5:
+                outcomes.append(("blind", None, client.put(url, json=body, headers=headers)))
+                continue
+            seen = client.get(url, headers=headers)
+            assert seen.status_code == 200
+            version = seen.json()["version"]
+            assert seen.headers["ETag"] == f'"{version}"'
+            response = client.put(url, json=body, headers={**headers, "If-Match": seen.headers["ETag"]})
+            outcomes.append(("if-match", version, response))
+        return outcomes
+
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        outcomes = [outcome for result in pool.map(hammer, range(CLIENTS)) for outcome in result]
+
+    final = client.get(url, headers=headers).json()
+    written = [response.json()["version"] for _, _, response in outcomes if response.status_code == 200]
+
+    # Every accepted write produced its own version; none was lost or applied twice
+    assert sorted(written) == list(range(2, final["version"] + 1))
+    assert all(response.status_code == 200 for kind, _, response in outcomes if kind == "blind")
+    for kind, version, response in outcomes:
+        if kind != "if-match":
+            continue
+        assert response.status_code in (200, 412)
+        if response.status_code == 200:
+            assert response.json()["version"] == version + 1
+        else:
+            # Refused only because another write got in after this client read the task
+            assert version + 1 in written
+
+    # An If-Match naming any earlier version is always refused
+    for stale in range(1, final["version"]):
+        response = client.put(url, json={"title": "stale"}, headers={**headers, "If-Match": f'"{stale}"'})
+        assert response.status_code == 412
+    assert client.get(url, headers=headers).json() == final
+
+
+def test_racing_if_match_writers_only_one_wins(client, make_user):
+    user_id, headers = make_user()
+    task_id = client.post("/api/v1/tasks", json={"title": "race"}, headers=headers).json()["id"]
+    start = threading.Barrier(CLIENTS)
+
+    def write(worker: int) -> int:
+        db = shard_router.session_for(user_id)
+        try:
+            start.wait()
+            TaskService.update_task(db, task_id, TaskUpdate(title=f"worker {worker}"), user_id, expected_version=1)
+            return 200
+        except HTTPException as e:
+            return e.status_code
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        statuses = list(pool.map(write, range(CLIENTS)))
+
+    assert sorted(statuses) == [200] + [412] * (CLIENTS - 1)
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=headers).json()["version"] == 2
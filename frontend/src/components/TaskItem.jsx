@@ -19,7 +19,7 @@ export default function TaskItem({ task, onTaskUpdated, onTaskDeleted }) {
       const response = await taskService.updateTask(task.id, {
         status: editData.status,
         priority: editData.priority,
-      });
+      }, task.version);
       onTaskUpdated(response.data);
       setIsEditing(false);
     } catch (err) {
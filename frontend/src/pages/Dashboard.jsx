@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import TaskForm from '../components/TaskForm';
 import TaskList from '../components/TaskList';
-import { taskService } from '../services/api';
+import { dashboardService } from '../services/api';
 import './Dashboard.css';
 
 export default function Dashboard() {
@@ -19,15 +19,16 @@ export default function Dashboard() {
       navigate('/login');
     } else {
       setUser(JSON.parse(storedUser));
-      fetchTasks();
+      fetchDashboard();
     }
   }, [navigate]);
 
-  const fetchTasks = async () => {
+  const fetchDashboard = async () => {
     setLoading(true);
     setError('');
     try {
-      const response = await taskService.getTasks(0, 20);
+      const response = await dashboardService.getDashboard(20);
+      setUser(response.data.user);
       setTasks(response.data.tasks);
     } catch (err) {
       setError('Failed to load tasks');
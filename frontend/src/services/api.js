@@ -2,18 +2,69 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api/v1';
 
+const REQUEST_TIMEOUT_MS = 15000;
+const MAX_RETRIES = 2;
+const MAX_RETRY_DELAY_MS = 5000;
+
 const api = axios.create({
   baseURL: API_BASE_URL,
+  timeout: REQUEST_TIMEOUT_MS,
   headers: {
     'Content-Type': 'application/json',
   },
 });
 
+// crypto.randomUUID only exists in secure contexts (HTTPS or localhost);
+// getRandomValues is available everywhere
+const newIdempotencyKey = () => {
+  if (window.crypto?.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  const bytes = new Uint8Array(16);
+  if (window.crypto?.getRandomValues) {
+    window.crypto.getRandomValues(bytes);
+  } else {
+    bytes.forEach((_, i) => { bytes[i] = Math.floor(Math.random() * 256); });
+  }
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+};
+
+// Reads, and writes carrying an Idempotency-Key, are safe to send again when
+// the request timed out, never got a response, or was shed with a 503
+const isRetryable = (error) => {
+  const { config, response } = error;
+  if (!config || (config.retryCount || 0) >= MAX_RETRIES) {
+    return false;
+  }
+  if (config.method !== 'get' && !config.headers?.['Idempotency-Key']) {
+    return false;
+  }
+  return !response || response.status === 503;
+};
+
+const retryDelay = (error, attempt) => {
+  const retryAfter = Number(error.response?.headers?.['retry-after']);
+  const delay = retryAfter > 0 ? retryAfter * 1000 : 500 * 2 ** attempt;
+  return Math.min(delay, MAX_RETRY_DELAY_MS);
+};
+
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  // One key per logical write; retries reuse this config, so the server
+  // replays the first response instead of repeating the write
+  if (
+    ['post', 'put', 'patch', 'delete'].includes(config.method) &&
+    config.url.startsWith('/tasks') &&
+    !config.headers['Idempotency-Key']
+  ) {
+    config.headers['Idempotency-Key'] = newIdempotencyKey();
+  }
   return config;
 }, (error) => {
   return Promise.reject(error);
@@ -22,6 +73,12 @@ api.interceptors.request.use((config) => {
 api.interceptors.response.use(
   (response) => response,
   (error) => {
+    if (isRetryable(error)) {
+      const { config } = error;
+      config.retryCount = (config.retryCount || 0) + 1;
+      return new Promise((resolve) => setTimeout(resolve, retryDelay(error, config.retryCount)))
+        .then(() => api(config));
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
       localStorage.removeItem('user');
@@ -48,14 +105,24 @@ export const taskService = {
   getTask: (taskId) =>
     api.get(`/tasks/${taskId}`),
   
+  getTasksByIds: (taskIds) =>
+    api.get('/tasks', { params: { ids: taskIds.join(',') } }),
+  
   createTask: (title, description, priority) =>
     api.post('/tasks', { title, description, priority }),
   
-  updateTask: (taskId, data) =>
-    api.put(`/tasks/${taskId}`, data),
+  updateTask: (taskId, data, version) =>
+    api.put(`/tasks/${taskId}`, data, {
+      headers: version === undefined ? {} : { 'If-Match': `"${version}"` },
+    }),
   
   deleteTask: (taskId) =>
     api.delete(`/tasks/${taskId}`),
 };
 
+export const dashboardService = {
+  getDashboard: (limit = 20) =>
+    api.get('/dashboard', { params: { limit } }),
+};
+
 export default api;